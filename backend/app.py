@@ -1,4 +1,7 @@
+import os
+
 from app.routes import app
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0')
\ No newline at end of file
+    # Development server only; use `gunicorn -c gunicorn.conf.py app:app` in production
+    app.run(debug=os.environ.get("FLASK_DEBUG", "1") == "1", host='0.0.0.0')
\ No newline at end of file
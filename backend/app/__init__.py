@@ -1,7 +1,12 @@
-from flask import Flask
-from flask_cors import CORS
+# backend/app/__init__.py
+#
+# Importing the package (or app.game, app.lookup, ...) loads neither Flask nor
+# the models. The Flask app is built by app/routes.py on first access to
+# app.app, which is what `gunicorn app:app` and app.py ask for.
 
-app = Flask(__name__)
-CORS(app)
 
-from app import routes  # 👈 this imports and registers your routes
+def __getattr__(name):
+    if name == "app":
+        from app.routes import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,150 @@
+# backend/app/async_server.py
+#
+# asyncio serving mode: same endpoints and JSON contracts as app/routes.py,
+# served by aiohttp. Idle or slow connections cost no thread; the blocking
+# parts of a request (model inference, session store access) run on a
+# bounded thread pool so the event loop never waits on them.
+
+import os
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+
+from app.logging_setup import configure_logging
+
+configure_logging()
+
+from app import service, metrics
+
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type",
+}
+
+DEFAULT_EXECUTOR_THREADS = 8
+
+
+def _executor_threads():
+    """
+    ASYNC_EXECUTOR_THREADS, else a default that fits a full inference batch:
+    in batched mode each /move holds a thread while it waits on the
+    micro-batcher, so a smaller pool would cap every batch at its size.
+    """
+    if os.environ.get("ASYNC_EXECUTOR_THREADS"):
+        return int(os.environ["ASYNC_EXECUTOR_THREADS"])
+    if service.INFERENCE_MODE == "batched":
+        return service.models.max_batch_size + DEFAULT_EXECUTOR_THREADS
+    return DEFAULT_EXECUTOR_THREADS
+
+
+_executor = ThreadPoolExecutor(max_workers=_executor_threads(), thread_name_prefix="game-api")
+
+
+async def _call(func, *args):
+    loop = asyncio.get_running_loop()
+    payload, status = await loop.run_in_executor(_executor, func, *args)
+    return web.json_response(payload, status=status)
+
+
+async def _json_body(request):
+    try:
+        data = await request.json()
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+@web.middleware
+async def cors_middleware(request, handler):
+    # Same policy as flask_cors' CORS(app): any origin, with preflight support
+    if request.method == "OPTIONS":
+        return web.Response(headers=CORS_HEADERS)
+    response = await handler(request)
+    response.headers.update(CORS_HEADERS)
+    return response
+
+
+@web.middleware
+async def metrics_middleware(request, handler):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as e:
+        status = e.status
+        raise
+    finally:
+        route = request.match_info.route.resource
+        endpoint = route.canonical if route is not None else "unmatched"
+        metrics.observe_request(request.method, endpoint, status, time.perf_counter() - started)
+
+
+async def new_game(request):
+    return await _call(service.new_game, await _json_body(request))
+
+
+async def make_move(request):
+    return await _call(service.make_move, await _json_body(request))
+
+
+async def make_moves_batch(request):
+    return await _call(service.make_moves_batch, await _json_body(request))
+
+
+async def play_out(request):
+    return await _call(service.play_out, await _json_body(request))
+
+
+async def get_state(request):
+    return await _call(service.get_state, request.query.get("game_id"))
+
+
+async def get_score(request):
+    return await _call(service.get_score)
+
+
+async def get_inference_stats(request):
+    return await _call(service.get_inference_stats)
+
+
+async def get_models(request):
+    return await _call(service.get_models)
+
+
+async def reset_score(request):
+    return await _call(service.reset_score)
+
+
+async def get_ready(request):
+    # Answered on the loop: it reads two flags, and must not queue behind requests waiting for the models
+    payload, status = service.get_ready()
+    return web.json_response(payload, status=status)
+
+
+async def get_metrics(request):
+    loop = asyncio.get_running_loop()
+    # Scraping reads the session store, which may block
+    text, status = await loop.run_in_executor(_executor, service.get_metrics)
+    return web.Response(text=text, status=status, headers={"Content-Type": metrics.CONTENT_TYPE})
+
+
+def create_app():
+    app = web.Application(middlewares=[metrics_middleware, cors_middleware])
+    app.router.add_post("/new_game", new_game)
+    app.router.add_post("/move", make_move)
+    app.router.add_post("/moves/batch", make_moves_batch)
+    app.router.add_post("/play_out", play_out)
+    app.router.add_get("/state", get_state)
+    app.router.add_get("/score", get_score)
+    app.router.add_get("/inference_stats", get_inference_stats)
+    app.router.add_get("/models", get_models)
+    app.router.add_post("/reset_score", reset_score)
+    app.router.add_get("/ready", get_ready)
+    app.router.add_get("/metrics", get_metrics)
+    service.start_warm_up()
+    return app
@@ -0,0 +1,117 @@
+# backend/app/batching.py
+
+import os
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from app.utils import best_moves
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-board inference requests into one batched call.
+
+    predict_batch: callable taking float32[B, 9] boards and returning [B, 9] Q-values.
+
+    A background thread waits for the first request, then keeps collecting
+    until max_batch_size requests are queued or max_wait_ms has passed since
+    that first request, runs one predict_batch call and resolves every
+    caller's Future with (best legal move, Q-vector). Only requests that
+    wait at the same time are coalesced, so callers must not hold a lock
+    other requests need while they wait: service.make_move releases the
+    session store's lock (a database-wide lock on SQLite) before inference.
+    """
+
+    def __init__(self, predict_batch, max_batch_size=64, max_wait_ms=2.0):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+        self.batch_sizes = {}  # batch size → number of batches
+        self.queue_waits = deque(maxlen=10000)  # recent per-request waits in seconds
+
+    def _ensure_worker(self):
+        # Threads do not survive fork (e.g. gunicorn preload): start one per process
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._thread.start()
+
+    def submit(self, board) -> Future:
+        """Queues one board; the Future resolves to (move, q_values)."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((np.asarray(board, dtype=np.float32), future, time.perf_counter()))
+        return future
+
+    def best_move(self, board, timeout=None):
+        """Blocking helper: returns (move, q_values) for one board."""
+        return self.submit(board).result(timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            boards = np.stack([board for board, _, _ in batch])
+            try:
+                q_values = np.asarray(self.predict_batch(boards))
+                moves = best_moves(q_values, boards)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            for i, (_, future, _) in enumerate(batch):
+                future.set_result((int(moves[i]), q_values[i]))
+
+            with self._stats_lock:
+                self.batches += 1
+                self.requests += len(batch)
+                self.batch_sizes[len(batch)] = self.batch_sizes.get(len(batch), 0) + 1
+                self.queue_waits.extend(started - queued_at for _, _, queued_at in batch)
+
+    def stats(self):
+        """Batch-size histogram and queue-wait summary (milliseconds)."""
+        with self._stats_lock:
+            waits = np.array(self.queue_waits) * 1000.0
+            return {
+                "batches": self.batches,
+                "requests": self.requests,
+                "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+                "batch_sizes": dict(sorted(self.batch_sizes.items())),
+                "queue_wait_ms": {
+                    "mean": float(waits.mean()) if len(waits) else 0.0,
+                    "p50": float(np.percentile(waits, 50)) if len(waits) else 0.0,
+                    "p99": float(np.percentile(waits, 99)) if len(waits) else 0.0,
+                    "max": float(waits.max()) if len(waits) else 0.0,
+                },
+            }
@@ -10,8 +10,145 @@ CELL_X = 1
 CELL_O = -1
 CELL_EMPTY = 0
 
+# Bitboard tables: cell i ↔ bit (1 << i) of a 9-bit mask, one mask per player
+FULL_MASK = 0b111111111
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+)
+
+
+def _bit_indexes(mask):
+    indexes = []
+    while mask:
+        low = mask & -mask
+        indexes.append(low.bit_length() - 1)
+        mask ^= low
+    return tuple(indexes)
+
+
+_MASK_INDEXES = tuple(_bit_indexes(m) for m in range(1 << 9))  # set cells of every mask
+_MASK_BITS = tuple(tuple((m >> i) & 1 for i in range(9)) for m in range(1 << 9))
+_MASK_IS_WIN = tuple(any(m & w == w for w in WIN_MASKS) for m in range(1 << 9))
+_MASK_BASE3 = tuple(sum(3 ** i for i in _MASK_INDEXES[m]) for m in range(1 << 9))
+
 
 class TicTacToe:
+    """
+    Bitboard engine: X and O stones are two 9-bit integer masks.
+    Exposes the same API as ListTicTacToe; `board` is materialized on access.
+    """
+
+    __slots__ = ("x_mask", "o_mask", "current_player", "current_winner")
+
+    def __init__(self, board=None, current_player=1):
+        self.x_mask = 0
+        self.o_mask = 0
+        if board is not None:
+            self.board = board
+        self.current_player = current_player
+        self.current_winner = None
+
+    @classmethod
+    def from_masks(cls, x_mask: int, o_mask: int, current_player=1):
+        game = cls.__new__(cls)
+        game.x_mask = x_mask
+        game.o_mask = o_mask
+        game.current_player = current_player
+        game.current_winner = None
+        return game
+
+    @property
+    def board(self):
+        return list(map(int.__sub__, _MASK_BITS[self.x_mask], _MASK_BITS[self.o_mask]))
+
+    @board.setter
+    def board(self, board):
+        self.x_mask = sum(1 << i for i, cell in enumerate(board) if cell == 1)
+        self.o_mask = sum(1 << i for i, cell in enumerate(board) if cell == -1)
+
+    def make_move(self, position: int) -> bool:
+        if 0 <= position <= 8:
+            bit = 1 << position
+            if not (self.x_mask | self.o_mask) & bit:
+                if self.current_player == 1:
+                    self.x_mask |= bit
+                else:
+                    self.o_mask |= bit
+                return True
+        return False
+
+    def play_move(self, position: int):
+        """Returns a new TicTacToe object with the move applied (immutable style)."""
+        if not 0 <= position <= 8:
+            raise ValueError("Invalid move: Position out of range.")
+        bit = 1 << position
+        if (self.x_mask | self.o_mask) & bit:
+            raise ValueError("Invalid move: Cell already occupied.")
+
+        if self.current_player == 1:
+            return TicTacToe.from_masks(self.x_mask | bit, self.o_mask, -1)
+        return TicTacToe.from_masks(self.x_mask, self.o_mask | bit, 1)
+
+    def switch_player(self):
+        self.current_player *= -1
+
+    def available_moves(self):
+        return list(_MASK_INDEXES[FULL_MASK & ~(self.x_mask | self.o_mask)])
+
+    def is_full(self):
+        return (self.x_mask | self.o_mask) == FULL_MASK
+
+    def check_winner(self):
+        if _MASK_IS_WIN[self.x_mask]:
+            self.current_winner = 1
+            return 1
+        if _MASK_IS_WIN[self.o_mask]:
+            self.current_winner = -1
+            return -1
+        return None
+
+    def get_game_result(self):
+        if _MASK_IS_WIN[self.x_mask]:
+            self.current_winner = 1
+            return RESULT_X_WINS
+        if _MASK_IS_WIN[self.o_mask]:
+            self.current_winner = -1
+            return RESULT_O_WINS
+        if (self.x_mask | self.o_mask) == FULL_MASK:
+            return RESULT_DRAW
+        return RESULT_NOT_OVER
+
+    def get_valid_move_indexes(self):
+        return list(_MASK_INDEXES[FULL_MASK & ~(self.x_mask | self.o_mask)])
+
+    def get_illegal_move_indexes(self):
+        return list(_MASK_INDEXES[self.x_mask | self.o_mask])
+
+    def get_player_symbol(self):
+        return 'X' if self.current_player == 1 else 'O'
+
+    def encode(self) -> int:
+        """Base-3 board index (0 = empty, 1 = X, 2 = O per cell), see app.lookup."""
+        return _MASK_BASE3[self.x_mask] + 2 * _MASK_BASE3[self.o_mask]
+
+    def print_board(self):
+        symbols = {1: 'X', -1: 'O', 0: ' '}
+        board = self.board
+        for i in range(0, 9, 3):
+            row = [symbols[board[i + j]] for j in range(3)]
+            print(" | ".join(row))
+            if i < 6:
+                print("--+---+--")
+
+    def copy(self):
+        return TicTacToe.from_masks(self.x_mask, self.o_mask, self.current_player)
+
+
+class ListTicTacToe:
+    """Original list-backed engine, kept as a readable reference implementation."""
+
     def __init__(self, board=None, current_player=1):
         self.board = board if board is not None else [0] * 9
         self.current_player = current_player
@@ -30,7 +167,7 @@ class TicTacToe:
 
         new_board = self.board.copy()
         new_board[position] = self.current_player
-        return TicTacToe(board=new_board, current_player=-self.current_player)
+        return ListTicTacToe(board=new_board, current_player=-self.current_player)
 
     def switch_player(self):
         self.current_player *= -1
@@ -83,15 +220,29 @@ class TicTacToe:
                 print("--+---+--")
 
     def copy(self):
-        return TicTacToe(board=self.board.copy(), current_player=self.current_player)
+        return ListTicTacToe(board=self.board.copy(), current_player=self.current_player)
 
 
 # 🎮 Game loop runner (used in training/evaluation)
-def play_game(player_x, player_o):
+def play_game(player_x, player_o, record=None):
+    """
+    Plays one game between two players (game → game after their move).
+    record: optional callable(moves, result) called with the cells played
+    and the result once the game is over (e.g. GameRecordWriter.append).
+    """
     game = TicTacToe()
-    while game.get_game_result() is RESULT_NOT_OVER:
-        if game.current_player == 1:
-            game = player_x(game)
-        else:
-            game = player_o(game)
+    if record is None:
+        while game.get_game_result() is RESULT_NOT_OVER:
+            if game.current_player == 1:
+                game = player_x(game)
+            else:
+                game = player_o(game)
+        return game
+
+    moves = []
+    while (result := game.get_game_result()) is RESULT_NOT_OVER:
+        occupied = game.x_mask | game.o_mask
+        game = player_x(game) if game.current_player == 1 else player_o(game)
+        moves.append(((game.x_mask | game.o_mask) ^ occupied).bit_length() - 1)
+    record(moves, result)
     return game
@@ -0,0 +1,230 @@
+# backend/app/game_records.py
+#
+# Compact binary log of finished games. Each game is one 6-byte record
+# appended to a flat file, so the log can be memory-mapped and streamed
+# in constant memory:
+#
+#   game     uint32  bits 0-18: the move order as a Lehmer code (ply k picks
+#                    one of the 9 - k free cells, in increasing cell order;
+#                    9! < 2**19)
+#                    bits 19-22: number of moves, bits 23-24: result
+#                    (0 = draw, 1 = X wins, 2 = O wins)
+#   x_agent  uint8   index into the agent names in <log>.agents (one per line)
+#   o_agent  uint8
+#
+#   from app.game_records import iter_games, read_agents
+#   for chunk in iter_games("logs/games.bin"):
+#       chunk["moves"], chunk["num_moves"], chunk["result"], chunk["x_agent"], ...
+
+import os
+import threading
+
+import numpy as np
+
+from app.game import RESULT_X_WINS, RESULT_O_WINS, RESULT_DRAW
+
+try:
+    import fcntl
+except ImportError:  # Windows: agent ids are then only safe within one process
+    fcntl = None
+
+RECORD_DTYPE = np.dtype([
+    ("game", "<u4"),
+    ("x_agent", "u1"),
+    ("o_agent", "u1"),
+])
+GAME_DTYPE = np.dtype([
+    ("moves", "i1", (9,)),  # cell per ply, -1 after the last move
+    ("num_moves", "u1"),
+    ("result", "i1"),
+    ("x_agent", "u1"),
+    ("o_agent", "u1"),
+])
+
+MAX_AGENTS = 256
+_LEHMER_BITS = 19
+_RESULT_CODES = {RESULT_DRAW: 0, RESULT_X_WINS: 1, RESULT_O_WINS: 2}
+
+
+def agents_path_for(path) -> str:
+    """logs/games.bin → logs/games.bin.agents"""
+    return path + ".agents"
+
+
+def read_agents(path):
+    """Agent names of a game log, indexed by the ids stored in its records."""
+    try:
+        with open(agents_path_for(path)) as f:
+            return [line.rstrip("\n") for line in f]
+    except FileNotFoundError:
+        return []
+
+
+def encode_game(moves, result) -> int:
+    """Packs one finished game (list of cells, result) into the `game` field."""
+    free = list(range(9))
+    code, radix = 0, 1
+    for ply, move in enumerate(moves):
+        code += free.index(move) * radix
+        radix *= 9 - ply
+        free.remove(move)
+    return code | (len(moves) << _LEHMER_BITS) | (_RESULT_CODES[result] << (_LEHMER_BITS + 4))
+
+
+def encode_games(moves, results):
+    """Vectorized encode_game: moves int8[N, 9] padded with -1, results int[N] → uint32[N]."""
+    moves = np.asarray(moves)
+    n = len(moves)
+    rows = np.arange(n)
+    taken = np.zeros((n, 9), dtype=bool)
+    codes = np.zeros(n, dtype=np.int64)
+    num_moves = (moves >= 0).sum(axis=1)
+    radix = 1
+    for ply in range(9):
+        played = moves[:, ply] >= 0
+        cells = np.where(played, moves[:, ply], 0)
+        # Lehmer digit: free cells below the chosen one
+        digits = np.cumsum(~taken, axis=1)[rows, cells] - 1
+        codes += np.where(played, digits, 0) * radix
+        taken[rows[played], cells[played]] = True
+        radix *= 9 - ply
+    result_codes = np.select([np.asarray(results) == RESULT_X_WINS, np.asarray(results) == RESULT_O_WINS], [1, 2], 0)
+    return (codes | (num_moves << _LEHMER_BITS) | (result_codes << (_LEHMER_BITS + 4))).astype(np.uint32)
+
+
+def decode_games(records):
+    """RECORD_DTYPE records → GAME_DTYPE array with the move sequences unpacked."""
+    codes = records["game"].astype(np.int64)
+    n = len(records)
+    games = np.zeros(n, dtype=GAME_DTYPE)
+    games["num_moves"] = (codes >> _LEHMER_BITS) & 0xF
+    result_codes = (codes >> (_LEHMER_BITS + 4)) & 0x3
+    games["result"] = np.select([result_codes == 1, result_codes == 2], [RESULT_X_WINS, RESULT_O_WINS], RESULT_DRAW)
+    games["x_agent"] = records["x_agent"]
+    games["o_agent"] = records["o_agent"]
+
+    rows = np.arange(n)
+    lehmer = codes & ((1 << _LEHMER_BITS) - 1)
+    free = np.ones((n, 9), dtype=bool)
+    moves = np.full((n, 9), -1, dtype=np.int8)
+    for ply in range(9):
+        lehmer, digits = np.divmod(lehmer, 9 - ply)
+        played = ply < games["num_moves"]
+        # The digit-th free cell (0-based)
+        cells = ((np.cumsum(free, axis=1) == (digits + 1)[:, None]) & free).argmax(axis=1)
+        moves[played, ply] = cells[played]
+        free[rows[played], cells[played]] = False
+    games["moves"] = moves
+    return games
+
+
+class AgentTable:
+    """
+    Agent name → id for one log, shared by every process appending to it
+    through <log>.agents. New names are added under an exclusive file lock.
+    """
+
+    def __init__(self, log_path):
+        self.path = agents_path_for(log_path)
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    def id_for(self, name) -> int:
+        agent_id = self._ids.get(name)
+        if agent_id is not None:
+            return agent_id
+        with self._lock, open(self.path, "a+") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            names = [line.rstrip("\n") for line in f]
+            if name not in names:
+                if len(names) >= MAX_AGENTS:
+                    raise ValueError(f"{self.path}: more than {MAX_AGENTS} agents")
+                f.write(name + "\n")
+                f.flush()
+                names.append(name)
+            self._ids = {agent: i for i, agent in enumerate(names)}
+            return self._ids[name]
+
+
+class GameRecordWriter:
+    """
+    Appends finished games to a game log. Records are buffered and written
+    buffer_size at a time with one O_APPEND write, so several processes can
+    append to the same log. Thread-safe.
+    """
+
+    def __init__(self, path, buffer_size=4096):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.agents = AgentTable(path)
+        self.buffer_size = buffer_size
+        self._buffer = np.zeros(buffer_size, dtype=RECORD_DTYPE)
+        self._count = 0
+        self._lock = threading.Lock()
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def append(self, moves, result, x_agent, o_agent):
+        """moves: the cells played, in order; result: RESULT_X_WINS / RESULT_O_WINS / RESULT_DRAW."""
+        code = encode_game(moves, result)
+        x_id, o_id = self.agents.id_for(x_agent), self.agents.id_for(o_agent)
+        with self._lock:
+            self._buffer[self._count] = (code, x_id, o_id)
+            self._count += 1
+            if self._count == self.buffer_size:
+                self._write()
+
+    def append_many(self, moves, results, x_agent, o_agent):
+        """Vectorized append for games between the same two agents (moves int8[N, 9] padded with -1)."""
+        records = np.zeros(len(moves), dtype=RECORD_DTYPE)
+        records["game"] = encode_games(moves, results)
+        records["x_agent"] = self.agents.id_for(x_agent)
+        records["o_agent"] = self.agents.id_for(o_agent)
+        with self._lock:
+            self._write()
+            os.write(self._fd, records.tobytes())
+
+    def _write(self):
+        if self._count:
+            os.write(self._fd, self._buffer[:self._count].tobytes())
+            self._count = 0
+
+    def flush(self):
+        with self._lock:
+            self._write()
+
+    def close(self):
+        self.flush()
+        os.close(self._fd)
+
+
+def open_records(path):
+    """Memory-maps a game log as RECORD_DTYPE records (a torn record at the end is ignored)."""
+    count = os.path.getsize(path) // RECORD_DTYPE.itemsize if os.path.exists(path) else 0
+    if count == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", shape=(count,))
+
+
+def iter_games(path, chunk_size=1 << 16):
+    """Yields the log as decoded GAME_DTYPE chunks of up to chunk_size games: constant memory."""
+    records = open_records(path)
+    for start in range(0, len(records), chunk_size):
+        yield decode_games(records[start:start + chunk_size])
+
+
+def replay(games):
+    """
+    Walks a GAME_DTYPE chunk ply by ply. Yields (ply, rows, boards, moves):
+    the games still running at that ply, their boards before the move
+    (int8[B, 9]) and the move played. X moves on even plies.
+    """
+    boards = np.zeros((len(games), 9), dtype=np.int8)
+    for ply in range(9):
+        rows = np.flatnonzero(games["num_moves"] > ply)
+        if not len(rows):
+            return
+        moves = games["moves"][rows, ply].astype(np.intp)
+        yield ply, rows, boards[rows], moves
+        boards[rows, moves] = 1 if ply % 2 == 0 else -1
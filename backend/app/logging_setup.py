@@ -0,0 +1,146 @@
+# backend/app/logging_setup.py
+#
+# Leveled logging for the backend. Request threads only put records on an
+# in-memory queue; a background listener thread formats them and writes to
+# stdout. Environment:
+#   LOG_LEVEL                DEBUG / INFO (default) / WARNING / ...
+#   LOG_FORMAT               text (default) or json (one JSON object per line)
+#   QVALUE_LOG_SAMPLE_RATE   fraction of model moves whose Q-values are logged at DEBUG (default 0.01)
+
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import random
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_QUEUE_SIZE = 10000
+
+_configured = False
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update((key, value) for key, value in getattr(record, "fields", {}).items() if key != "board_text")
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        text = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            text += " " + " ".join(f"{key}={value}" for key, value in fields.items() if key != "board_text")
+            if "board_text" in fields:
+                text += "\n" + fields["board_text"]
+        return text
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Puts records on a bounded queue drained by a listener thread. When the
+    queue is full the record is dropped (and counted) instead of blocking the
+    caller. The listener is (re)started per process, since threads do not
+    survive fork (gunicorn preload).
+    """
+
+    def __init__(self, target_handler, maxsize=LOG_QUEUE_SIZE):
+        super().__init__(queue.Queue(maxsize))
+        self.target_handler = target_handler
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._pid = None
+        self._listener = None
+        self._lock = threading.Lock()
+
+    def _ensure_listener(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self.queue = queue.Queue(self.maxsize)
+                self._listener = QueueListener(self.queue, self.target_handler, respect_handler_level=True)
+                self._listener.start()
+                atexit.register(self._listener.stop)  # drains the queue on exit
+                self._pid = os.getpid()
+
+    def prepare(self, record):
+        # Format here would cost the caller; the listener's handler formats instead
+        return record
+
+    def enqueue(self, record):
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """Waits (briefly) until the listener has written everything queued so far."""
+        deadline = time.monotonic() + 2.0
+        while not self.queue.empty() and time.monotonic() < deadline:
+            time.sleep(0.001)
+        self.target_handler.flush()
+
+
+def configure_logging():
+    """Installs the queue-backed handler on the 'app' logger. Safe to call repeatedly."""
+    global _configured
+    if _configured:
+        return
+    _configured = True
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if os.environ.get("LOG_FORMAT", "text") == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(TextFormatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    logger = logging.getLogger("app")
+    logger.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+    logger.addHandler(NonBlockingQueueHandler(stream_handler))
+    logger.propagate = False
+
+
+def log_event(logger, level, event, **fields):
+    """Logs a structured event; `fields` become JSON keys (or key=value pairs in text mode)."""
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={"fields": fields})
+
+
+def format_board(board):
+    symbols = {1: 'X', -1: 'O', 0: ' '}
+    rows = [" | ".join(symbols[board[i + j]] for j in range(3)) for i in range(0, 9, 3)]
+    return "\n--+---+--\n".join(rows)
+
+
+def log_board(logger, game, **fields):
+    """DEBUG-level board dump; costs nothing when DEBUG is off."""
+    if logger.isEnabledFor(logging.DEBUG):
+        board = game.board
+        logger.debug("board", extra={"fields": dict(fields, board=board, board_text=format_board(board))})
+
+
+QVALUE_LOG_SAMPLE_RATE = float(os.environ.get("QVALUE_LOG_SAMPLE_RATE", "0.01"))
+
+
+def log_q_values(logger, board, q_values, move):
+    """Logs the Q-values of a sampled fraction of model moves at DEBUG."""
+    if logger.isEnabledFor(logging.DEBUG) and random.random() < QVALUE_LOG_SAMPLE_RATE:
+        logger.debug("q_values", extra={"fields": {
+            "board": list(board),
+            "q_values": [round(float(q), 4) for q in q_values],
+            "move": move,
+        }})
@@ -0,0 +1,158 @@
+# backend/app/lookup.py
+
+import hashlib
+import logging
+import os
+
+import numpy as np
+
+from app import utils
+from app.game import TicTacToe, RESULT_NOT_OVER
+
+# Every board is a 9-digit base-3 number: digit i is 0 (empty), 1 (X) or 2 (O)
+NUM_ENCODINGS = 3 ** 9
+_POWERS = tuple(3 ** i for i in range(9))
+
+NO_MOVE = -1
+
+logger = logging.getLogger(__name__)
+
+
+def encode_board(board) -> int:
+    """Maps a 9-cell board (0 / 1 / -1) to its base-3 index in [0, 3**9)."""
+    return sum(p * (cell % 3) for p, cell in zip(_POWERS, board))
+
+
+def encode_boards(boards):
+    """Vectorized encode_board for an array of boards of shape (B, 9)."""
+    return (np.asarray(boards).astype(np.int64) % 3) @ np.array(_POWERS)
+
+
+def enumerate_reachable_boards():
+    """Returns every board reachable from the empty board by legal play (5,478 in total)."""
+    seen = {}
+    stack = [TicTacToe()]
+    while stack:
+        game = stack.pop()
+        code = game.encode()
+        if code in seen:
+            continue
+        seen[code] = game
+        if game.get_game_result() is RESULT_NOT_OVER:
+            for move in game.get_valid_move_indexes():
+                stack.append(game.play_move(move))
+    return list(seen.values())
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class QTable:
+    """
+    Precomputed model output for every reachable, unfinished board.
+
+    best_moves: int8[3**9]  → best legal move per encoding (NO_MOVE if terminal/unreachable)
+    rows:       int16[3**9] → row into q_values per encoding (-1 if not stored)
+    q_values:   float32[n, 9] → raw network output for the stored boards
+    """
+
+    def __init__(self, best_moves, rows, q_values, model_sha256=""):
+        self.best_moves = best_moves
+        self.rows = rows
+        self.q_values = q_values
+        self.model_sha256 = model_sha256
+
+    def best_move(self, board) -> int:
+        move = int(self.best_moves[encode_board(board)])
+        if move == NO_MOVE:
+            raise ValueError("Board is finished or not reachable by legal play.")
+        return move
+
+    def best_moves_for(self, boards):
+        """Batched best_move/q_values_for: returns (moves int[B], Q-values float32[B, 9])."""
+        codes = encode_boards(boards)
+        moves = self.best_moves[codes]
+        if (moves == NO_MOVE).any():
+            raise ValueError("Board is finished or not reachable by legal play.")
+        return moves.astype(np.intp), self.q_values[self.rows[codes]]
+
+    def q_values_for(self, board):
+        row = self.rows[encode_board(board)]
+        if row < 0:
+            raise ValueError("Board is finished or not reachable by legal play.")
+        return self.q_values[row]
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"  # workers may rebuild the same table at once
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                best_moves=self.best_moves,
+                rows=self.rows,
+                q_values=self.q_values,
+                model_sha256=np.array(self.model_sha256),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(
+                best_moves=data["best_moves"],
+                rows=data["rows"],
+                q_values=data["q_values"],
+                model_sha256=str(data["model_sha256"]),
+            )
+
+
+def build_qtable(predict, model_sha256=""):
+    """
+    Runs one batched forward pass over all unfinished reachable boards.
+    predict maps float32 boards [B, 9] to Q-values [B, 9] (see app.numpy_model.load_predictor).
+    """
+    boards = [g.board for g in enumerate_reachable_boards() if g.get_game_result() is RESULT_NOT_OVER]
+    board_array = np.array(boards, dtype=np.float32)
+
+    q_values = np.asarray(predict(board_array), dtype=np.float32)
+
+    best = utils.best_moves(q_values, board_array)
+
+    best_moves = np.full(NUM_ENCODINGS, NO_MOVE, dtype=np.int8)
+    rows = np.full(NUM_ENCODINGS, -1, dtype=np.int16)
+    for row, board in enumerate(boards):
+        code = encode_board(board)
+        best_moves[code] = best[row]
+        rows[code] = row
+
+    return QTable(best_moves, rows, q_values, model_sha256=model_sha256)
+
+
+def load_qtable(table_path, model_path):
+    """
+    Loads the lookup table from disk, rebuilding it only when the artifact is
+    missing or was built from a different model file. If the model file is
+    absent (artifact-only deployments), the table is used as is.
+    """
+    if not os.path.exists(model_path) and os.path.exists(table_path):
+        return QTable.load(table_path)
+
+    model_sha256 = file_sha256(model_path)
+    if os.path.exists(table_path):
+        table = QTable.load(table_path)
+        if table.model_sha256 == model_sha256:
+            return table
+        logger.info("Q-table %s is stale, rebuilding from %s", table_path, model_path)
+    else:
+        logger.info("Building Q-table %s from %s", table_path, model_path)
+
+    from app.numpy_model import load_predictor
+
+    table = build_qtable(load_predictor(model_path), model_sha256=model_sha256)
+    table.save(table_path)
+    return table
@@ -0,0 +1,202 @@
+# backend/app/metrics.py
+#
+# Minimal Prometheus-style instrumentation: counters, gauges and histograms
+# with labels, rendered in the text exposition format served on /metrics.
+# Values recorded here are per process: with several gunicorn workers a scrape
+# sees the worker that answered it (process_id tells which). Metrics computed
+# from the session store at scrape time (scores, store size) are shared.
+
+import os
+import math
+import time
+import threading
+from contextlib import contextmanager
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans lookup-table answers (µs) up to slow requests
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name, help_text, labelnames=(), function=None):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        # Optional scrape-time source: returns the value, or {label values tuple: value}
+        self.function = function
+        self._lock = threading.Lock()
+        self._values = {}  # label values tuple → value
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self):
+        """Yields (suffix, label pairs, value)."""
+        if self.function is not None:
+            values = self.function()
+            items = values.items() if isinstance(values, dict) else [((), values)]
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        for key, value in items:
+            yield "", tuple(zip(self.labelnames, key)), value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+        for suffix, labels, value in self._samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self):
+        with self._lock:
+            items = [(key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items()]
+        for key, (counts, total, count) in items:
+            labels = tuple(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                yield "_bucket", labels + (("le", _format_value(bound)),), cumulative
+            yield "_sum", labels, total
+            yield "_count", labels, count
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name, help_text, labelnames=(), function=None):
+    return REGISTRY.register(Counter(name, help_text, labelnames, function=function))
+
+
+def gauge(name, help_text, labelnames=(), function=None):
+    return REGISTRY.register(Gauge(name, help_text, labelnames, function=function))
+
+
+def histogram(name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+    return REGISTRY.register(Histogram(name, help_text, labelnames, buckets=buckets))
+
+
+def _resident_memory_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # peak, in KiB on Linux
+
+
+def render():
+    return REGISTRY.render()
+
+
+# HTTP layer, recorded by both servers (app/routes.py and app/async_server.py)
+REQUEST_LATENCY = histogram(
+    "http_request_duration_seconds", "Time spent handling a request.", ("method", "endpoint", "status"))
+
+
+def observe_request(method, endpoint, status, seconds):
+    REQUEST_LATENCY.observe(seconds, method=method, endpoint=endpoint, status=status)
+
+
+# Process-level metrics
+gauge("process_resident_memory_bytes", "Resident memory size in bytes.", function=_resident_memory_bytes)
+gauge("process_id", "PID of the worker process that answered this scrape.", function=os.getpid)
+_STARTED_AT = time.time()
+gauge("process_start_time_seconds", "Start time of the process since unix epoch in seconds.",
+      function=lambda: _STARTED_AT)
@@ -0,0 +1,203 @@
+# backend/app/minimax.py
+
+import os
+
+import numpy as np
+
+from app.game import (
+    TicTacToe, FULL_MASK, RESULT_NOT_OVER,
+    _MASK_INDEXES, _MASK_IS_WIN,
+)
+from app.symmetry import canonical_encoding
+from app.paths import MODELS_DIR
+
+NUM_ENCODINGS = 3 ** 9
+NO_MOVE = -1
+
+# Transposition table entry flags
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+MINIMAX_TABLE_PATH = os.path.join(MODELS_DIR, "minimax_table.npz")
+
+
+def _masks(game: TicTacToe):
+    """(mover's mask, opponent's mask) for the player to move."""
+    if game.current_player == 1:
+        return game.x_mask, game.o_mask
+    return game.o_mask, game.x_mask
+
+
+class MinimaxSolver:
+    """
+    Negamax with alpha-beta pruning and a transposition table.
+
+    Searches directly on the bitboard masks, so no TicTacToe objects are
+    allocated below the root. Values are from the point of view of the
+    player to move: +1 win, 0 draw, -1 loss. With prefer_fast_wins=True a
+    win is worth 1 + (empty cells left), so quicker wins and slower losses
+    rank higher.
+    """
+
+    def __init__(self, prefer_fast_wins=False):
+        self.prefer_fast_wins = prefer_fast_wins
+        # Symmetric boards share a value, so entries are keyed on the
+        # mover-relative canonical encoding (see app.symmetry)
+        self.table = {}  # canonical encoding → (value, flag)
+
+    def _win_score(self, occupied):
+        if self.prefer_fast_wins:
+            return 1 + len(_MASK_INDEXES[FULL_MASK & ~occupied])
+        return 1
+
+    def _negamax(self, own, other, alpha, beta):
+        if _MASK_IS_WIN[other]:
+            return -self._win_score(own | other)
+        occupied = own | other
+        if occupied == FULL_MASK:
+            return 0
+
+        key = canonical_encoding(own, other)
+        entry = self.table.get(key)
+        if entry is not None:
+            value, flag = entry
+            if flag == EXACT:
+                return value
+            if flag == LOWER_BOUND:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+        alpha_orig = alpha
+        best = -100
+        for move in _MASK_INDEXES[FULL_MASK & ~occupied]:
+            score = -self._negamax(other, own | (1 << move), -beta, -alpha)
+            if score > best:
+                best = score
+                if best > alpha:
+                    alpha = best
+                    if alpha >= beta:
+                        break
+
+        if best <= alpha_orig:
+            flag = UPPER_BOUND
+        elif best >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self.table[key] = (best, flag)
+        return best
+
+    def value(self, game: TicTacToe) -> int:
+        """Exact game value for the player to move."""
+        own, other = _masks(game)
+        return self._negamax(own, other, -100, 100)
+
+    def move_values(self, game: TicTacToe):
+        """{move: exact value for the player to move after playing it}."""
+        own, other = _masks(game)
+        return {
+            move: -self._negamax(other, own | (1 << move), -100, 100)
+            for move in _MASK_INDEXES[FULL_MASK & ~(own | other)]
+        }
+
+    def best_move(self, game: TicTacToe) -> int:
+        """Lowest-index move among those with the best exact value."""
+        values = self.move_values(game)
+        if not values:
+            raise ValueError("No legal moves: the game is already over.")
+        return max(values, key=values.get)
+
+
+class PerfectPlayTable:
+    """
+    Solved values and best moves for every reachable board, indexed by the
+    same base-3 encoding as TicTacToe.encode().
+
+    values:     int8[3**9] → exact value for the player to move
+    best_moves: int8[3**9] → best move (NO_MOVE for finished/unreachable boards)
+    """
+
+    def __init__(self, values, best_moves, prefer_fast_wins=False):
+        self.values = values
+        self.best_moves = best_moves
+        self.prefer_fast_wins = prefer_fast_wins
+
+    def best_move(self, game: TicTacToe) -> int:
+        move = int(self.best_moves[game.encode()])
+        if move == NO_MOVE:
+            raise ValueError("Board is finished or not reachable by legal play.")
+        return move
+
+    def value(self, game: TicTacToe) -> int:
+        return int(self.values[game.encode()])
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                values=self.values,
+                best_moves=self.best_moves,
+                prefer_fast_wins=np.array(self.prefer_fast_wins),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(
+                values=data["values"],
+                best_moves=data["best_moves"],
+                prefer_fast_wins=bool(data["prefer_fast_wins"]),
+            )
+
+
+def solve_all(prefer_fast_wins=False) -> PerfectPlayTable:
+    """Solves every reachable position once and returns the perfect-play table."""
+    solver = MinimaxSolver(prefer_fast_wins=prefer_fast_wins)
+    values = np.zeros(NUM_ENCODINGS, dtype=np.int8)
+    best_moves = np.full(NUM_ENCODINGS, NO_MOVE, dtype=np.int8)
+
+    seen = set()
+    stack = [TicTacToe()]
+    while stack:
+        game = stack.pop()
+        code = game.encode()
+        if code in seen:
+            continue
+        seen.add(code)
+
+        result = game.get_game_result()
+        if result is not RESULT_NOT_OVER:
+            values[code] = solver.value(game)
+            continue
+
+        move_values = solver.move_values(game)
+        best = max(move_values, key=move_values.get)
+        values[code] = move_values[best]
+        best_moves[code] = best
+        for move in move_values:
+            stack.append(game.play_move(move))
+
+    return PerfectPlayTable(values, best_moves, prefer_fast_wins=prefer_fast_wins)
+
+
+def load_or_solve(path=MINIMAX_TABLE_PATH, prefer_fast_wins=False) -> PerfectPlayTable:
+    """Loads the persisted table, solving and saving it if missing or built with other settings."""
+    if os.path.exists(path):
+        table = PerfectPlayTable.load(path)
+        if table.prefer_fast_wins == prefer_fast_wins:
+            return table
+    print(f"🧮 Solving all positions → {path}")
+    table = solve_all(prefer_fast_wins=prefer_fast_wins)
+    table.save(path)
+    return table
+
+
+if __name__ == "__main__":
+    load_or_solve()
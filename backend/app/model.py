@@ -19,3 +19,11 @@ class TicTacToeNet(nn.Module):
         x = F.relu(self.fc1(x))
         x = F.relu(self.fc2(x))
         return torch.sigmoid(self.output_layer(x))  # Q-values bounded in [0, 1]
+
+
+def load_model(path, device="cpu"):
+    """Builds a TicTacToeNet, loads weights from `path` and puts it in eval mode."""
+    model = TicTacToeNet()
+    model.load_state_dict(torch.load(path, map_location=device))
+    model.eval()
+    return model
@@ -0,0 +1,325 @@
+# backend/app/model_registry.py
+#
+# Serving-side model registry: several named models are held in memory at
+# once. Each answers from its Q-table (INFERENCE_MODE=lookup) or runs its
+# network through a micro-batcher (INFERENCE_MODE=batched). A watcher thread
+# reloads a model when its files change and swaps the new version in
+# atomically; requests that already hold the old version finish with it.
+# New games are routed to a model by weight, or by name if the client asks.
+#
+# The models come from MODEL_REGISTRY (default models/registry.json):
+#   {"models": [
+#       {"name": "qlearning", "path": "models/tictactoe_model_qlearning.pt", "weight": 90},
+#       {"name": "candidate", "path": "models/candidate.pt", "weight": 10}
+#   ]}
+# Optional per model: "qtable" (default <model>_qtable.npz). Relative paths
+# are taken from the backend directory. Without the file, the registry
+# serves models/tictactoe_model_qlearning.pt alone.
+
+import os
+import json
+import time
+import random
+import logging
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.lookup import load_qtable, file_sha256
+from app.utils import best_moves
+from app.paths import MODELS_DIR, backend_path
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_MODES = ("lookup", "batched")
+MODEL_PATH = os.path.join(MODELS_DIR, "tictactoe_model_qlearning.pt")
+QTABLE_PATH = os.path.join(MODELS_DIR, "tictactoe_qtable.npz")
+DEFAULT_MODEL_NAME = "qlearning"
+REGISTRY_PATH = os.environ.get("MODEL_REGISTRY", os.path.join(MODELS_DIR, "registry.json"))
+RELOAD_INTERVAL = float(os.environ.get("MODEL_RELOAD_INTERVAL", "5"))  # seconds; 0 disables hot reload
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    name: str
+    path: str
+    qtable_path: str
+    weight: float = 1.0  # routing share of new games; 0 serves only games asked for by name
+
+
+def qtable_path_for(model_path) -> str:
+    """models/x.pt → models/x_qtable.npz"""
+    return os.path.splitext(model_path)[0] + "_qtable.npz"
+
+
+def read_specs(registry_path):
+    """Model specs from the registry file, or the single default model if there is none."""
+    if not os.path.exists(registry_path):
+        return [ModelSpec(DEFAULT_MODEL_NAME, MODEL_PATH, QTABLE_PATH)]
+
+    with open(registry_path) as f:
+        entries = json.load(f)["models"]
+    specs = [
+        ModelSpec(
+            name=entry["name"],
+            path=backend_path(entry["path"]),
+            qtable_path=backend_path(entry.get("qtable") or qtable_path_for(entry["path"])),
+            weight=float(entry.get("weight", 1.0)),
+        )
+        for entry in entries
+    ]
+    names = [spec.name for spec in specs]
+    if not specs or len(set(names)) != len(names):
+        raise ValueError(f"{registry_path}: expected at least one model and unique names, got {names}")
+    if any(spec.weight < 0 for spec in specs) or not any(spec.weight > 0 for spec in specs):
+        raise ValueError(f"{registry_path}: weights must be >= 0 with at least one > 0")
+    return specs
+
+
+def _file_state(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ServedModel:
+    """
+    One loaded version of a model. Never changed after construction: a
+    reload builds a new ServedModel and the registry swaps it in.
+    """
+
+    def __init__(self, spec: ModelSpec, mode, version=1, batcher=None):
+        self.spec = spec
+        self.name = spec.name
+        self.mode = mode
+        self.version = version
+        self.loaded_at = time.time()
+
+        if mode == "lookup":
+            self.qtable = load_qtable(spec.qtable_path, spec.path)
+            self.predict = None
+            self.model_sha256 = self.qtable.model_sha256
+        else:
+            from app.numpy_model import load_predictor
+
+            self.qtable = None
+            self.predict = load_predictor(spec.path)
+            self.model_sha256 = file_sha256(spec.path) if os.path.exists(spec.path) else ""
+        self.batcher = batcher
+
+    def watched_files(self):
+        """Files whose change triggers a reload: the checkpoint and the artifact served from it."""
+        if self.mode == "lookup":
+            return self.spec.path, self.spec.qtable_path
+        from app.numpy_model import numpy_path_for
+        return self.spec.path, numpy_path_for(self.spec.path)
+
+    def best_move(self, board):
+        """Returns (best legal move, Q-values) for a board."""
+        if self.batcher is not None:
+            return self.batcher.best_move(board)
+        return self.qtable.best_move(board), self.qtable.q_values_for(board)
+
+    def best_moves(self, boards):
+        """
+        One batched inference for many boards (float32[B, 9]): a vectorized
+        Q-table lookup, or a single forward pass that bypasses the micro-batcher.
+        Returns (moves int[B], Q-values [B, 9]).
+        """
+        if self.qtable is not None:
+            return self.qtable.best_moves_for(boards)
+        boards = np.asarray(boards, dtype=np.float32)
+        q_values = np.asarray(self.predict(boards))
+        return best_moves(q_values, boards), q_values
+
+    def describe(self):
+        return {
+            "name": self.name,
+            "path": self.spec.path,
+            "model_sha256": self.model_sha256,
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+        }
+
+
+class ModelRegistry:
+    """
+    Named ServedModels plus the routing weights. Readers take the current
+    snapshot once and never see a half-applied reload: reload() builds every
+    new version first, then replaces the snapshot in one assignment.
+
+    Nothing is loaded at construction: load() (an explicit warm-up) or the
+    first choose()/get() reads the registry and loads every model.
+    """
+
+    def __init__(self, mode, registry_path=REGISTRY_PATH, reload_interval=RELOAD_INTERVAL,
+                 max_batch_size=64, max_wait_ms=2.0, seed=None):
+        if mode not in INFERENCE_MODES:
+            raise ValueError(f"Unknown INFERENCE_MODE '{mode}', expected one of {INFERENCE_MODES}")
+        self.mode = mode
+        self.registry_path = registry_path
+        self.reload_interval = reload_interval
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.reloads = {}  # name → number of versions swapped in after the first
+
+        self._rng = random.Random(seed)
+        self._reload_lock = threading.Lock()
+        self._batchers = {}  # name → MicroBatcher, kept across reloads
+        self._file_states = {}  # name → states of ServedModel.watched_files()
+        # (name → ServedModel, routed names, cumulative weights), replaced as a whole
+        self._snapshot = ({}, (), ())
+        self._registry_state = None
+        self._watcher = None
+        self._watcher_pid = None
+
+        self.weights = {}  # name → routing weight
+        self._specs = None
+        self._loaded = threading.Event()
+
+    @property
+    def ready(self):
+        """True once every model has been loaded."""
+        return self._loaded.is_set()
+
+    def load(self):
+        """Reads the registry and loads every model, once; concurrent callers wait for the first."""
+        if self._loaded.is_set():
+            return
+        with self._reload_lock:
+            if self._loaded.is_set():
+                return
+            # The first load must succeed; later reload failures keep the old versions
+            self._registry_state = _file_state(self.registry_path)
+            self._specs = read_specs(self.registry_path)
+            self._apply_specs(self._specs, strict=True)
+            self._loaded.set()
+
+    @property
+    def default_name(self):
+        """First routed model: serves games whose model was removed from the registry."""
+        self.load()
+        return self._snapshot[1][0]
+
+    def models(self):
+        """Loaded models (none before load())."""
+        return list(self._snapshot[0].values())
+
+    def _batcher(self, name):
+        if self.mode != "batched":
+            return None
+        if name not in self._batchers:
+            from app.batching import MicroBatcher
+            self._batchers[name] = MicroBatcher(None, self.max_batch_size, self.max_wait_ms)
+        return self._batchers[name]
+
+    def _load(self, spec, current):
+        version = current.version + 1 if current is not None else 1
+        model = ServedModel(spec, self.mode, version=version, batcher=self._batcher(spec.name))
+        states = tuple(_file_state(path) for path in model.watched_files())
+        return model, states
+
+    def _apply_specs(self, specs, strict=False):
+        current_models = self._snapshot[0]
+        models = {}
+        file_states = {}
+        for spec in specs:
+            current = current_models.get(spec.name)
+            same_files = current is not None and (current.spec.path, current.spec.qtable_path) == (spec.path, spec.qtable_path)
+            if same_files:
+                states = tuple(_file_state(path) for path in current.watched_files())
+                if states == self._file_states[spec.name]:
+                    models[spec.name] = current
+                    file_states[spec.name] = states
+                    continue
+            try:
+                model, states = self._load(spec, current)
+            except Exception:
+                if strict:
+                    raise
+                logger.exception("Could not load model %s from %s; keeping the previous version", spec.name, spec.path)
+                if current is not None:
+                    models[spec.name] = current
+                    file_states[spec.name] = self._file_states[spec.name]
+                continue
+
+            if same_files and model.model_sha256 == current.model_sha256:
+                model = current  # files touched or artifact rewritten, same weights
+            elif current is not None:
+                self.reloads[spec.name] = self.reloads.get(spec.name, 0) + 1
+                logger.info("Model %s reloaded: version %d, sha256 %s", spec.name, model.version, model.model_sha256[:12])
+            else:
+                logger.info("Model %s loaded from %s", spec.name, spec.path)
+            models[spec.name] = model
+            file_states[spec.name] = states
+
+        weights = {spec.name: spec.weight for spec in specs if spec.name in models}
+        routed = [name for name, weight in weights.items() if weight > 0]
+        if not routed:
+            logger.error("No routable model after reload; keeping the previous registry")
+            return
+        cumulative, total = [], 0.0
+        for name in routed:
+            total += weights[name]
+            cumulative.append(total)
+
+        # Swap: the new predictor goes to the shared batcher, then the snapshot is replaced
+        for model in models.values():
+            if model.batcher is not None:
+                model.batcher.predict_batch = model.predict
+        self._file_states = file_states
+        self.weights = weights
+        self._snapshot = (models, tuple(routed), tuple(cumulative))
+
+    def reload(self):
+        """Re-reads the registry file if it changed and reloads every model whose files changed."""
+        if not self._loaded.is_set():
+            self.load()
+            return
+        with self._reload_lock:
+            registry_state = _file_state(self.registry_path)
+            if registry_state != self._registry_state:
+                try:
+                    self._specs = read_specs(self.registry_path)
+                except (OSError, ValueError, KeyError) as e:
+                    logger.error("Could not read model registry %s: %s", self.registry_path, e)
+                else:
+                    logger.info("Model registry %s changed", self.registry_path)
+                self._registry_state = registry_state
+            self._apply_specs(self._specs)
+
+    def _watch(self):
+        while True:
+            time.sleep(self.reload_interval)
+            try:
+                self.reload()
+            except Exception:
+                logger.exception("Model reload failed")
+
+    def _ensure_watcher(self):
+        # Threads do not survive fork (gunicorn preload): start one per process
+        self.load()
+        if self.reload_interval <= 0 or (self._watcher is not None and self._watcher_pid == os.getpid()):
+            return
+        with self._reload_lock:
+            if self._watcher is None or self._watcher_pid != os.getpid():
+                self._watcher_pid = os.getpid()
+                self._watcher = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+                self._watcher.start()
+
+    def choose(self, name=None) -> ServedModel:
+        """Model for a new game: `name` if given (KeyError if unknown), otherwise drawn by weight."""
+        self._ensure_watcher()
+        models, names, cumulative = self._snapshot
+        if name is not None:
+            return models[name]
+        return models[self._rng.choices(names, cum_weights=cumulative)[0]]
+
+    def get(self, name) -> ServedModel:
+        """Current version of a game's model; games of a removed model continue with the default one."""
+        self._ensure_watcher()
+        models, names, _ = self._snapshot
+        return models.get(name) or models[names[0]]
@@ -0,0 +1,166 @@
+# backend/app/numpy_model.py
+#
+# Torch-free inference for TicTacToeNet. The weights are exported once from
+# the .pt checkpoint to a plain .npz next to it; serving and evaluation can
+# then run the network with NumPy alone.
+#
+#   python -m app.numpy_model [--model models/tictactoe_model_qlearning.pt]
+
+import os
+import logging
+import argparse
+
+import numpy as np
+
+from app.lookup import file_sha256
+from app.utils import best_moves
+from app.paths import MODELS_DIR
+
+logger = logging.getLogger(__name__)
+
+MODEL_PATH = os.path.join(MODELS_DIR, "tictactoe_model_qlearning.pt")
+
+# MODEL_BACKEND=numpy (default) | torch, used wherever the network is run
+MODEL_BACKENDS = ("numpy", "torch")
+MODEL_BACKEND = os.environ.get("MODEL_BACKEND", "numpy")
+
+LAYERS = ("fc1", "fc2", "output_layer")
+
+
+def numpy_path_for(model_path) -> str:
+    """models/x.pt → models/x.npz"""
+    return os.path.splitext(model_path)[0] + ".npz"
+
+
+class NumpyTicTacToeNet:
+    """
+    Same forward pass as app.model.TicTacToeNet, in float32 NumPy:
+    relu(fc1) → relu(fc2) → sigmoid(output_layer).
+    """
+
+    def __init__(self, weights, model_sha256=""):
+        # Stored transposed so the forward pass is x @ W (C-contiguous, no copy per call)
+        self.fc1_w = np.ascontiguousarray(weights["fc1.weight"].T, dtype=np.float32)
+        self.fc1_b = np.asarray(weights["fc1.bias"], dtype=np.float32)
+        self.fc2_w = np.ascontiguousarray(weights["fc2.weight"].T, dtype=np.float32)
+        self.fc2_b = np.asarray(weights["fc2.bias"], dtype=np.float32)
+        self.out_w = np.ascontiguousarray(weights["output_layer.weight"].T, dtype=np.float32)
+        self.out_b = np.asarray(weights["output_layer.bias"], dtype=np.float32)
+        self.model_sha256 = model_sha256
+
+    def __call__(self, x):
+        """
+        x: array of shape (9,) or (batch_size, 9)
+        returns: float32 array of the same shape with values in [0, 1]
+        """
+        x = np.asarray(x, dtype=np.float32)
+        h = np.maximum(x @ self.fc1_w + self.fc1_b, 0.0)
+        h = np.maximum(h @ self.fc2_w + self.fc2_b, 0.0)
+        z = h @ self.out_w + self.out_b
+        return (1.0 / (1.0 + np.exp(-z))).astype(np.float32, copy=False)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            weights = {key: data[key] for key in data.files if key != "model_sha256"}
+            model_sha256 = str(data["model_sha256"]) if "model_sha256" in data.files else ""
+        return cls(weights, model_sha256=model_sha256)
+
+
+def export_weights(model_path, out_path=None):
+    """Writes the checkpoint's state_dict to an uncompressed .npz (needs torch)."""
+    import torch
+
+    out_path = out_path or numpy_path_for(model_path)
+    state_dict = torch.load(model_path, map_location="cpu")
+    arrays = {key: tensor.detach().numpy().astype(np.float32) for key, tensor in state_dict.items()}
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"  # workers may re-export the same checkpoint at once
+    with open(tmp_path, "wb") as f:
+        np.savez(f, model_sha256=np.array(file_sha256(model_path)), **arrays)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def load_numpy_model(model_path=MODEL_PATH, npz_path=None):
+    """
+    Loads the exported weights, re-exporting (and importing torch) only when
+    the .npz is missing or was exported from a different checkpoint. If the
+    checkpoint itself is absent (torch-free deployments), the .npz is used as is.
+    """
+    npz_path = npz_path or numpy_path_for(model_path)
+    if not os.path.exists(model_path):
+        return NumpyTicTacToeNet.load(npz_path)
+
+    if os.path.exists(npz_path):
+        net = NumpyTicTacToeNet.load(npz_path)
+        if net.model_sha256 == file_sha256(model_path):
+            return net
+        logger.info("NumPy weights %s are stale, re-exporting from %s", npz_path, model_path)
+    else:
+        logger.info("Exporting NumPy weights %s from %s", npz_path, model_path)
+
+    export_weights(model_path, npz_path)
+    return NumpyTicTacToeNet.load(npz_path)
+
+
+def load_predictor(model_path=MODEL_PATH, backend=None):
+    """
+    Returns predict(boards) → Q-values, mapping a float32 array of shape (9,)
+    or (batch_size, 9) to a NumPy array of the same shape, on the chosen backend.
+    """
+    backend = backend or MODEL_BACKEND
+    if backend == "numpy":
+        return load_numpy_model(model_path)
+    if backend == "torch":
+        import torch
+        from app.model import load_model
+
+        model = load_model(model_path)
+
+        def predict(boards):
+            with torch.no_grad():
+                return model(torch.as_tensor(np.asarray(boards, dtype=np.float32))).numpy()
+
+        return predict
+    raise ValueError(f"Unknown MODEL_BACKEND '{backend}', expected one of {MODEL_BACKENDS}")
+
+
+_predictors = {}  # (model_path, backend) → predictor, see cached_predictor
+
+
+def cached_predictor(model_path=MODEL_PATH, backend=None):
+    """
+    load_predictor(model_path, backend), loaded on first use and then reused:
+    evaluation scripts call it per move, and importing them stays cheap.
+    """
+    key = (model_path, backend or MODEL_BACKEND)
+    if key not in _predictors:
+        _predictors[key] = load_predictor(*key)
+    return _predictors[key]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export TicTacToeNet weights for torch-free inference.")
+    parser.add_argument("--model", default=MODEL_PATH, help="PyTorch checkpoint to export")
+    parser.add_argument("--out", default=None, help="output .npz (default: next to the checkpoint)")
+    args = parser.parse_args()
+
+    out_path = export_weights(args.model, args.out)
+    print(f"💾 Weights exported to {out_path}")
+
+    # Check the NumPy forward pass against torch on every reachable board
+    from app.lookup import enumerate_reachable_boards
+
+    boards = np.array([g.board for g in enumerate_reachable_boards()], dtype=np.float32)
+    expected = load_predictor(args.model, backend="torch")(boards)
+    actual = NumpyTicTacToeNet.load(out_path)(boards)
+    masked_expected = best_moves(expected, boards)
+    masked_actual = best_moves(actual, boards)
+    print(f"✅ Max |Δq| vs torch: {np.abs(expected - actual).max():.2e}, "
+          f"move mismatches: {int((masked_expected != masked_actual).sum())} / {len(boards)}")
+
+
+if __name__ == "__main__":
+    main()
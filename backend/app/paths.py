@@ -0,0 +1,17 @@
+# backend/app/paths.py
+#
+# Default locations of the backend's models, logs and data, anchored to the
+# backend directory so the API, evaluators and tools work from any CWD.
+# Paths given explicitly (environment variables, CLI flags) are used as is.
+
+import os
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODELS_DIR = os.path.join(BACKEND_DIR, "models")
+LOGS_DIR = os.path.join(BACKEND_DIR, "logs")
+DATA_DIR = os.path.join(BACKEND_DIR, "data")
+
+
+def backend_path(path) -> str:
+    """Resolves a path relative to the backend directory (absolute paths are returned unchanged)."""
+    return os.path.join(BACKEND_DIR, path)
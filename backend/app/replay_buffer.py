@@ -0,0 +1,86 @@
+# backend/app/replay_buffer.py
+
+import numpy as np
+
+
+class ReplayBuffer:
+    """
+    Fixed-capacity ring buffer of (board, move, reward, next_board, done)
+    transitions, preallocated as NumPy arrays so adding and sampling never
+    allocate per transition.
+    """
+
+    def __init__(self, capacity: int, seed=None):
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+        self.boards = np.zeros((capacity, 9), dtype=np.float32)
+        self.moves = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_boards = np.zeros((capacity, 9), dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.position = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, board, move, reward, next_board, done):
+        i = self.position
+        self.boards[i] = board
+        self.moves[i] = move
+        self.rewards[i] = reward
+        self.next_boards[i] = next_board
+        self.dones[i] = done
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_batch(self, boards, moves, rewards, next_boards, dones):
+        """Inserts a batch of transitions, wrapping around the ring as needed."""
+        n = len(moves)
+        idx = (self.position + np.arange(n)) % self.capacity
+        self.boards[idx] = boards
+        self.moves[idx] = moves
+        self.rewards[idx] = rewards
+        self.next_boards[idx] = next_boards
+        self.dones[idx] = dones
+        self.position = int((self.position + n) % self.capacity)
+        self.size = min(self.size + n, self.capacity)
+
+    def sample(self, batch_size: int):
+        """Uniformly samples batch_size transitions (with replacement)."""
+        idx = self.rng.integers(0, self.size, size=batch_size)
+        return (
+            self.boards[idx],
+            self.moves[idx],
+            self.rewards[idx],
+            self.next_boards[idx],
+            self.dones[idx],
+        )
+
+    def state_dict(self):
+        """Contents, ring position and sampling RNG state, for training checkpoints."""
+        n = self.size
+        return {
+            "capacity": self.capacity,
+            "position": self.position,
+            "size": n,
+            "rng_state": self.rng.bit_generator.state,
+            "boards": self.boards[:n].copy(),
+            "moves": self.moves[:n].copy(),
+            "rewards": self.rewards[:n].copy(),
+            "next_boards": self.next_boards[:n].copy(),
+            "dones": self.dones[:n].copy(),
+        }
+
+    def load_state_dict(self, state):
+        if state["capacity"] != self.capacity:
+            raise ValueError(f"Checkpoint buffer capacity {state['capacity']} != {self.capacity}")
+        n = state["size"]
+        self.boards[:n] = state["boards"]
+        self.moves[:n] = state["moves"]
+        self.rewards[:n] = state["rewards"]
+        self.next_boards[:n] = state["next_boards"]
+        self.dones[:n] = state["dones"]
+        self.position = state["position"]
+        self.size = n
+        self.rng.bit_generator.state = state["rng_state"]
@@ -0,0 +1,568 @@
+# backend/app/service.py
+#
+# Framework-independent game API: every handler takes plain data and returns
+# (JSON-serializable payload, HTTP status). Served by app/routes.py (Flask)
+# and app/async_server.py (aiohttp).
+
+import os
+import time
+import logging
+import threading
+
+import numpy as np
+
+from app.game import TicTacToe, RESULT_X_WINS, RESULT_O_WINS, RESULT_DRAW
+from app.game_records import GameRecordWriter
+from app.lookup import encode_boards
+from app.model_registry import ModelRegistry
+from app.vec_game import play_lockstep
+from app.utils import random_moves
+from app.sessions import create_session_store
+from app.logging_setup import log_event, log_board, log_q_values
+from app import metrics
+from app.paths import LOGS_DIR
+
+logger = logging.getLogger(__name__)
+
+# Games and the running score live in the session store (see app/sessions.py),
+# so they stay consistent across threads and worker processes
+games = create_session_store()
+NEW_GAME_LOCK = "new_game"
+
+# Request size limits of /moves/batch and /play_out
+MAX_BATCH_MOVES = int(os.environ.get("MAX_BATCH_MOVES", "1000"))
+MAX_PLAY_OUT_GAMES = int(os.environ.get("MAX_PLAY_OUT_GAMES", "1000"))
+_perfect_play = None  # minimax table for the "minimax" play-out agent, loaded on first use
+
+# Every finished game (and play-out) is appended to a binary game log (see app/game_records.py);
+# GAME_LOG_PATH= (empty) turns it off
+GAME_LOG_PATH = os.environ.get("GAME_LOG_PATH", os.path.join(LOGS_DIR, "games.bin"))
+game_log = GameRecordWriter(GAME_LOG_PATH, buffer_size=1) if GAME_LOG_PATH else None
+HUMAN_AGENT = "human"
+
+# INFERENCE_MODE=lookup (default): answer from the precomputed Q-table (rebuilt if the model changed)
+# INFERENCE_MODE=batched: run the network, coalescing concurrent requests into one forward pass
+# (MODEL_BACKEND=numpy (default) runs without torch; MODEL_BACKEND=torch uses the checkpoint directly)
+INFERENCE_MODE = os.environ.get("INFERENCE_MODE", "lookup")
+
+# Served models, hot-reloaded when their files change (see app/model_registry.py).
+# Nothing is loaded at import: see warm_up()
+models = ModelRegistry(
+    INFERENCE_MODE,
+    max_batch_size=int(os.environ.get("BATCH_MAX_SIZE", "64")),
+    max_wait_ms=float(os.environ.get("BATCH_MAX_WAIT_MS", "2")),
+)
+
+# MODEL_WARMUP=background (default): the server accepts connections at once and loads the models
+#   on a thread; GET /ready answers 503 until they are loaded
+# MODEL_WARMUP=eager: load before serving (gunicorn preload sets this: the master loads, workers fork warm)
+# MODEL_WARMUP=lazy: ready at once, the first game loads the models
+WARMUP_MODES = ("background", "eager", "lazy")
+MODEL_WARMUP = os.environ.get("MODEL_WARMUP", "background")
+_warm_up_thread = None
+_warm_up_seconds = None
+_warm_up_error = None
+
+# Metrics (see app/metrics.py); store-backed values are read at scrape time
+INFERENCE_LATENCY = metrics.histogram(
+    "model_inference_duration_seconds", "Time to pick the model's move (includes batching queue wait).",
+    ("mode", "model"))
+metrics.gauge("games_in_flight", "Unfinished games in the session store.", function=lambda: games.count_unfinished())
+metrics.gauge("game_store_size", "Games (unfinished and finished) held by the session store.", function=lambda: len(games))
+_RESULT_LABELS = {"score_x": "x_wins", "score_o": "o_wins", "score_draws": "draw"}
+metrics.counter(
+    "games_finished_total", "Finished games by result (not cleared by score resets).", ("result",),
+    function=lambda: {(_RESULT_LABELS[key],): value for key, value in games.get_result_totals().items()},
+)
+metrics.gauge(
+    "score_games", "Finished games by result since the last score reset (the scoreboard).", ("result",),
+    function=lambda: {(_RESULT_LABELS[key],): value for key, value in games.get_scores().items()},
+)
+metrics.counter(
+    "model_games_finished_total", "Finished games per model and outcome for the model (not cleared by score resets).",
+    ("model", "outcome"),
+    function=lambda: {(model, outcome): n for model, results in games.get_model_results().items()
+                      for outcome, n in results.items()},
+)
+metrics.gauge("models_ready", "1 once every served model is loaded.", function=lambda: int(models.ready))
+metrics.gauge("model_warmup_seconds", "Time the start-up warm-up took (0 until it finished).",
+              function=lambda: _warm_up_seconds or 0.0)
+metrics.gauge("model_routing_weight", "Share of new games routed to each model, by weight.", ("model",),
+              function=lambda: {(name,): weight for name, weight in models.weights.items()})
+metrics.counter("model_reloads_total", "New model versions swapped in by hot reload.", ("model",),
+                function=lambda: {(name,): n for name, n in models.reloads.items()})
+if INFERENCE_MODE == "batched":
+    metrics.counter("inference_batches_total", "Batched forward passes run.", ("model",),
+                    function=lambda: {(m.name,): m.batcher.batches for m in models.models()})
+    metrics.counter("inference_batched_requests_total", "Boards answered by batched forward passes.", ("model",),
+                    function=lambda: {(m.name,): m.batcher.requests for m in models.models()})
+
+def warm_up():
+    """Loads every served model and runs one inference with each, so no request pays for either."""
+    global _warm_up_seconds, _warm_up_error
+    started = time.perf_counter()
+    try:
+        models.load()
+        for model in models.models():
+            # Bypasses the micro-batcher: no thread is started (gunicorn forks after an eager warm-up)
+            model.best_moves(np.zeros((1, 9), dtype=np.float32))
+    except Exception as e:
+        _warm_up_error = f"{type(e).__name__}: {e}"
+        raise
+    _warm_up_seconds = time.perf_counter() - started
+    _warm_up_error = None
+    log_event(logger, logging.INFO, "warm_up_done", seconds=round(_warm_up_seconds, 3),
+              models=[model.name for model in models.models()])
+
+def _warm_up_in_background():
+    try:
+        warm_up()
+    except Exception:
+        logger.exception("Warm-up failed; models will load on first use")
+
+def start_warm_up():
+    """Called by each server once at start-up; warms up as MODEL_WARMUP says."""
+    global _warm_up_thread
+    if MODEL_WARMUP not in WARMUP_MODES:
+        raise ValueError(f"Unknown MODEL_WARMUP '{MODEL_WARMUP}', expected one of {WARMUP_MODES}")
+    if MODEL_WARMUP == "eager":
+        warm_up()
+    elif MODEL_WARMUP == "background" and _warm_up_thread is None:
+        _warm_up_thread = threading.Thread(target=_warm_up_in_background, name="warm-up", daemon=True)
+        _warm_up_thread.start()
+
+def get_model_move(game: TicTacToe, model):
+    started = time.perf_counter()
+    best_move, q_values = model.best_move(game.board)
+    INFERENCE_LATENCY.observe(time.perf_counter() - started, mode=INFERENCE_MODE, model=model.name)
+    log_q_values(logger, game.board, q_values, best_move)
+    return best_move
+
+def record_game_over(game_id, game_data, result):
+    game_data["result"] = result
+    games.record_result(result)
+    if result == 0:
+        outcome = "draws"
+    else:
+        outcome = "wins" if result == game_data["model_player"] else "losses"
+    # Games stored before they were tied to a model count for the default one
+    model_name = game_data.get("model") or models.default_name
+    games.record_model_result(model_name, outcome)
+    log_event(logger, logging.INFO, "game_over", game_id=game_id, result=result,
+              moves_played=game_data["moves_played"], model=model_name)
+    log_score()
+
+    # Games stored before moves were kept cannot be logged
+    if game_log is not None and game_data.get("moves") is not None:
+        x_agent, o_agent = (HUMAN_AGENT, model_name) if game_data["human_player"] == 1 else (model_name, HUMAN_AGENT)
+        game_log.append(game_data["moves"], result, x_agent, o_agent)
+
+def log_score():
+    log_event(logger, logging.INFO, "score", **games.get_scores())
+
+def new_game(data):
+    choice = data.get("choice")
+    model_name = data.get("model")
+
+    if choice not in [1, 2]:
+        return {"error": "You must choose 1 (play as X) or 2 (play as O)"}, 400
+    if model_name is not None and not isinstance(model_name, str):
+        return {"error": f"Unknown model '{model_name}'"}, 400
+
+    # Resuming or creating must be atomic, or concurrent calls start two games. The
+    # model's first move is computed outside the lock (on SQLite it locks the whole
+    # store), so the check for an unfinished game runs again before storing.
+    with games.locked(NEW_GAME_LOCK):
+        resumed = resume_game(model_name)
+    if resumed is not None:
+        return resumed
+
+    # An explicit model wins over the routing weights
+    try:
+        model = models.choose(model_name)
+    except KeyError:
+        return {"error": f"Unknown model '{model_name}'"}, 400
+
+    game_data = start_game(choice, model)
+    with games.locked(NEW_GAME_LOCK):
+        resumed = resume_game(model_name)
+        if resumed is not None:
+            return resumed
+        game_id = games.new_id()
+        games.put(game_id, game_data)
+
+    game = game_data["game"]
+    log_event(logger, logging.INFO, "game_started", game_id=game_id, model=model.name,
+              human_player='X' if game_data["human_player"] == 1 else 'O',
+              model_player='X' if game_data["model_player"] == 1 else 'O')
+    if game_data["last_move"] is not None:
+        log_event(logger, logging.DEBUG, "model_move", game_id=game_id, move=game_data["last_move"])
+    log_board(logger, game, game_id=game_id)
+    return {
+        "game_id": game_id,
+        "current_player": game.current_player,
+        "model": model.name,
+    }, 200
+
+def resume_game(model_name=None):
+    """
+    The reply for the unfinished game, if one exists (and is played by the
+    requested model, if any), else None. The caller holds games.locked(NEW_GAME_LOCK).
+    """
+    unfinished = games.find_unfinished()
+    if unfinished is None or model_name not in (None, unfinished[1].get("model")):
+        return None
+    gid, gdata = unfinished
+    log_event(logger, logging.INFO, "game_resumed", game_id=gid)
+    log_board(logger, gdata["game"], game_id=gid)
+    return {
+        "game_id": gid,
+        "current_player": gdata["game"].current_player,
+        "model": gdata.get("model"),
+    }, 200
+
+def start_game(choice, model):
+    """A new session for `model`, with its first move played if it is X; not stored."""
+    game = TicTacToe()
+    human_player = 1 if choice == 1 else -1
+    model_player = -human_player
+
+    # If model is X, make the first move
+    first_move = None
+    if game.current_player == model_player:
+        first_move = get_model_move(game, model)
+        game.make_move(first_move)
+        game.switch_player()
+
+    return {
+        "game": game,
+        "last_move": first_move,
+        "result": None,
+        "moves_played": 1 if first_move is not None else 0,
+        "human_player": human_player,
+        "model_player": model_player,
+        "model": model.name,
+        "moves": [first_move] if first_move is not None else []
+    }
+
+def make_move(data):
+    if not isinstance(data, dict):
+        return {"error": "Expected a {game_id, move} object"}, 400
+    game_id = data.get("game_id")
+    move = data.get("move")
+
+    # Inference runs outside the lock (on SQLite it locks the whole store), on a copy
+    # of the session; the reply is only stored if the game did not change meanwhile
+    with games.locked(game_id):
+        game_data = _load_session(game_id)
+        board_before = game_data["game"].board if game_data is not None else None
+        game_data, reply = human_move(game_id, game_data, move)
+    if game_data is None:
+        return reply
+
+    # The game stays with its model; the current version answers, even if reloaded mid-game
+    model_move = get_model_move(game_data["game"], models.get(game_data.get("model")))
+    with games.locked(game_id):
+        if _session_changed(game_id, board_before):
+            return {"error": "Game changed during the move"}, 409
+        return model_reply(game_id, game_data, model_move)
+
+def human_move(game_id, game_data, move):
+    """
+    Validates and plays the human's move on game_data (the session read by
+    the caller, who holds games.locked(game_id)). A move that ends the game
+    is stored; otherwise nothing is, and the caller stores the session with
+    the model's reply. Returns (game_data, None) when the model is to reply,
+    else (None, (payload, status)).
+    """
+    if game_data is None:
+        return None, ({"error": "Invalid game_id"}, 400)
+
+    game = game_data["game"]
+
+    # Another request may have finished this game while we waited for the lock
+    if game_data["result"] is not None:
+        return None, ({"error": "Game is already over"}, 400)
+
+    # Sessions are only stored with the human to move; anything else is a stale state
+    if game.current_player != game_data["human_player"]:
+        return None, ({"error": "Not your turn"}, 409)
+
+    if not isinstance(move, int) or not (0 <= move < 9) or game.board[move] != 0:
+        return None, ({"error": "Invalid move"}, 400)
+
+    game.make_move(move)
+    game_data["last_move"] = move
+    game_data["moves_played"] += 1
+    if game_data.get("moves") is not None:
+        game_data["moves"].append(move)
+    log_event(logger, logging.DEBUG, "human_move", game_id=game_id, move=move)
+    log_board(logger, game, game_id=game_id)
+
+    result = game.get_game_result()
+    if result is not None:
+        record_game_over(game_id, game_data, result)
+        games.put(game_id, game_data)
+        return None, ({
+            "result": result,
+            "next_player": None
+        }, 200)
+
+    game.switch_player()
+    return game_data, None
+
+def model_reply(game_id, game_data, model_move):
+    """Plays the model's reply, stores the game and returns (payload, status) for the move."""
+    game = game_data["game"]
+    game.make_move(model_move)
+    game_data["last_move"] = model_move
+    game_data["moves_played"] += 1
+    if game_data.get("moves") is not None:
+        game_data["moves"].append(model_move)
+    log_event(logger, logging.DEBUG, "model_move", game_id=game_id, move=model_move)
+    log_board(logger, game, game_id=game_id)
+
+    result = game.get_game_result()
+    if result is not None:
+        record_game_over(game_id, game_data, result)
+
+    game.switch_player()
+    games.put(game_id, game_data)
+    return {
+        "model_move": model_move,
+        "result": result,
+        "next_player": game.current_player
+    }, 200
+
+def _load_session(game_id):
+    """
+    A copy of the stored session, or None: changes stay private until put()
+    (the memory store hands out its own object), so a failure before the
+    model's reply is stored leaves the game as it was.
+    """
+    game_data = games.get(game_id)
+    if game_data is None:
+        return None
+    moves = game_data.get("moves")
+    return dict(game_data, game=game_data["game"].copy(), moves=list(moves) if moves is not None else None)
+
+def _session_changed(game_id, board_before):
+    """True if the stored game was played, finished, evicted or reset since its board was board_before."""
+    current = games.get(game_id)
+    return current is None or current["result"] is not None or current["game"].board != board_before
+
+def _with_status(reply):
+    payload, status = reply
+    return dict(payload, status=status)
+
+def make_moves_batch(data):
+    """
+    Plays many (game_id, move) items. Human moves are applied one by one
+    under each game's lock, to copies of the sessions; the model
+    replies of a round are then computed with one batched inference per
+    model, and each session is stored once, with the human move and the
+    reply together. Until then the stored game is unchanged, so a failure
+    in between loses the move but never leaves a game stuck on the model's
+    turn. Several moves for the same game run in order, one per round.
+    Returns one result per item, in order, each with its own status.
+    """
+    if not isinstance(data, dict):
+        return {"error": "Expected a {moves: [...]} object"}, 400
+    items = data.get("moves")
+    if not isinstance(items, list) or len(items) > MAX_BATCH_MOVES:
+        return {"error": f"'moves' must be a list of at most {MAX_BATCH_MOVES} {{game_id, move}} objects"}, 400
+
+    results = [None] * len(items)
+    rounds = []
+    moves_seen = {}  # game_id → items queued so far
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = _with_status(({"error": "Each item must be a {game_id, move} object"}, 400))
+            continue
+        game_id = item.get("game_id")
+        if not isinstance(game_id, str):
+            results[index] = _with_status(({"error": "Invalid game_id"}, 400))
+            continue
+        round_index = moves_seen.get(game_id, 0)
+        moves_seen[game_id] = round_index + 1
+        if round_index == len(rounds):
+            rounds.append([])
+        rounds[round_index].append(index)
+
+    for round_items in rounds:
+        pending = {}  # model name → [(index, game_id, board before the move, game_data)] awaiting the reply
+        for index in round_items:
+            game_id = items[index].get("game_id")
+            with games.locked(game_id):
+                game_data = _load_session(game_id)
+                board_before = game_data["game"].board if game_data is not None else None
+                game_data, reply = human_move(game_id, game_data, items[index].get("move"))
+            if game_data is None:
+                results[index] = _with_status(reply)
+                continue
+            model = models.get(game_data.get("model"))
+            pending.setdefault(model.name, []).append((index, game_id, board_before, game_data))
+
+        for model_name, entries in pending.items():
+            model = models.get(model_name)
+            boards = np.array([game_data["game"].board for _, _, _, game_data in entries], dtype=np.float32)
+            started = time.perf_counter()
+            best_moves, q_values = model.best_moves(boards)
+            INFERENCE_LATENCY.observe(time.perf_counter() - started, mode=INFERENCE_MODE, model=model.name)
+
+            for (index, game_id, board_before, game_data), board, best_move, q in zip(entries, boards, best_moves, q_values):
+                log_q_values(logger, board, q, int(best_move))
+                with games.locked(game_id):
+                    if _session_changed(game_id, board_before):
+                        results[index] = _with_status(({"error": "Game changed during the batch"}, 409))
+                        continue
+                    results[index] = _with_status(model_reply(game_id, game_data, int(best_move)))
+
+    return {"results": results}, 200
+
+def _play_out_policy(agent, rng):
+    """policy(boards) → moves for play_lockstep, or None for an unknown agent."""
+    if agent is not None and not isinstance(agent, str):
+        return None
+    if agent == "random":
+        return lambda boards: random_moves(boards, rng)
+    if agent == "minimax":
+        table = perfect_play_table()
+        return lambda boards: table.best_moves[encode_boards(boards)]
+
+    try:
+        model = models.choose(agent)  # one version for the whole play-out
+    except KeyError:
+        return None
+
+    def policy(boards):
+        started = time.perf_counter()
+        best_moves, _ = model.best_moves(boards.astype(np.float32))
+        INFERENCE_LATENCY.observe(time.perf_counter() - started, mode=INFERENCE_MODE, model=model.name)
+        return best_moves
+    return policy
+
+def perfect_play_table():
+    global _perfect_play
+    if _perfect_play is None:
+        from app.minimax import load_or_solve
+        _perfect_play = load_or_solve()
+    return _perfect_play
+
+def play_out(data):
+    """
+    Plays whole games server-side between two agents ("random", "minimax" or
+    a served model's name). All games advance together, so each ply is one
+    batched inference per model. Bot games are not stored or scored, only
+    appended to the game log.
+    """
+    if not isinstance(data, dict):
+        return {"error": "Expected a {x, o, games, seed} object"}, 400
+    agent_x, agent_o = data.get("x"), data.get("o")
+    num_games = data.get("games", 1)
+    seed = data.get("seed")
+    # bool is an int subclass, but true / false are not counts or seeds
+    if isinstance(num_games, bool) or not isinstance(num_games, int) or not (1 <= num_games <= MAX_PLAY_OUT_GAMES):
+        return {"error": f"'games' must be an integer from 1 to {MAX_PLAY_OUT_GAMES}"}, 400
+    if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int)):
+        return {"error": "'seed' must be an integer"}, 400
+
+    models.load()  # the error below lists the served models
+    rng = np.random.default_rng(seed)
+    policies = [_play_out_policy(agent, rng) for agent in (agent_x, agent_o)]
+    for agent, policy in zip((agent_x, agent_o), policies):
+        if policy is None:
+            return {"error": f"Unknown agent '{agent}': use 'random', 'minimax' or one of {[m.name for m in models.models()]}"}, 400
+
+    moves, results = play_lockstep(*policies, num_games)
+    log_event(logger, logging.INFO, "play_out", x=agent_x, o=agent_o, games=num_games)
+    if game_log is not None:
+        game_log.append_many(moves, results, agent_x, agent_o)
+    return {
+        "x": agent_x,
+        "o": agent_o,
+        "games": [
+            {"moves": [int(m) for m in game_moves if m >= 0], "result": int(result)}
+            for game_moves, result in zip(moves, results)
+        ],
+        "summary": {
+            "x_wins": int((results == RESULT_X_WINS).sum()),
+            "o_wins": int((results == RESULT_O_WINS).sum()),
+            "draws": int((results == RESULT_DRAW).sum()),
+        },
+    }, 200
+
+def get_state(game_id):
+    game_data = games.get(game_id)
+    if game_data is None:
+        return {"error": "Invalid game_id"}, 400
+
+    game = game_data["game"]
+    result = game_data["result"]
+
+    winner_message = None
+    if result == 1:
+        winner_message = "X wins"
+    elif result == -1:
+        winner_message = "O wins"
+    elif result == 0:
+        winner_message = "Draw"
+
+    log_event(logger, logging.DEBUG, "state_requested", game_id=game_id, winner_message=winner_message)
+    log_board(logger, game, game_id=game_id)
+
+    return {
+        "board": game.board,
+        "current_player": game.current_player,
+        "last_move": game_data["last_move"],
+        "moves_played": game_data["moves_played"],
+        "moves": game_data.get("moves"),
+        "game_over": result is not None,
+        "result": result,
+        "winner_message": winner_message,
+        "model": game_data.get("model")
+    }, 200
+
+def get_score():
+    scores = games.get_scores()
+    log_event(logger, logging.DEBUG, "score_requested", **scores)
+    return scores, 200
+
+def get_inference_stats():
+    stats = {"mode": INFERENCE_MODE}
+    if INFERENCE_MODE == "batched":
+        stats["models"] = {model.name: model.batcher.stats() for model in models.models()}
+    return stats, 200
+
+def get_models():
+    models.load()
+    results = games.get_model_results()
+    served = []
+    for model in models.models():
+        info = model.describe()
+        info["weight"] = models.weights.get(model.name, 0.0)
+        info["reloads"] = models.reloads.get(model.name, 0)
+        info["results"] = results.get(model.name, {})
+        served.append(info)
+    return {"mode": INFERENCE_MODE, "default": models.default_name, "models": served}, 200
+
+def get_ready():
+    """Readiness probe: 503 until the start-up warm-up has loaded the models (always ready with MODEL_WARMUP=lazy)."""
+    payload = {
+        "ready": models.ready or MODEL_WARMUP == "lazy",
+        "warmup": MODEL_WARMUP,
+        "models_loaded": models.ready,
+        "warmup_seconds": _warm_up_seconds,
+    }
+    if _warm_up_error is not None:
+        payload["error"] = _warm_up_error
+    return payload, 200 if payload["ready"] else 503
+
+def get_metrics():
+    """Prometheus text exposition; not JSON, so servers return it with metrics.CONTENT_TYPE."""
+    return metrics.render(), 200
+
+def reset_score():
+    games.reset()
+    log_event(logger, logging.INFO, "score_reset")
+    return {"message": "Score and game history reset."}, 200
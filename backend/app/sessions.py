@@ -0,0 +1,443 @@
+# backend/app/sessions.py
+
+import os
+import time
+import uuid
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from app.game import TicTacToe
+from app.paths import DATA_DIR
+
+# Defaults, overridable through the environment (see create_session_store)
+DEFAULT_MAX_GAMES = 10000
+DEFAULT_TTL_SECONDS = 3600  # unfinished games untouched this long are abandoned
+DEFAULT_FINISHED_TTL_SECONDS = 600  # finished games stay readable via /state this long
+DEFAULT_DB_PATH = os.path.join(DATA_DIR, "sessions.sqlite3")
+LOCK_STRIPES = 64
+
+RESULT_SCORE_KEYS = {1: "score_x", -1: "score_o", 0: "score_draws"}
+MODEL_OUTCOMES = ("wins", "losses", "draws")  # from the model's side
+
+
+class SessionStore(ABC):
+    """
+    Interface for game sessions and the running score. A session is the dict
+    used by the routes:
+    {"game": TicTacToe, "last_move", "result", "moves_played", "human_player", "model_player", "model",
+     "moves": cells played so far, in order}
+
+    get() returns a session or None; changes made to it are only kept once
+    they are written back with put(). Read-modify-write sequences must run
+    inside `with store.locked(game_id):` to be safe under concurrent requests.
+    """
+
+    def __init__(self):
+        self._stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+    def new_id(self) -> str:
+        return uuid.uuid4().hex
+
+    def _stripe(self, key):
+        return self._stripes[hash(key) % LOCK_STRIPES]
+
+    @abstractmethod
+    def locked(self, key):
+        """Context manager serializing all updates that use the same key."""
+
+    @abstractmethod
+    def get(self, game_id):
+        ...
+
+    @abstractmethod
+    def put(self, game_id, session):
+        ...
+
+    @abstractmethod
+    def find_unfinished(self):
+        """Returns (game_id, session) for the most recently updated unfinished game, or None."""
+
+    @abstractmethod
+    def count_unfinished(self):
+        """Number of games in flight (unfinished and not yet expired)."""
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+    @abstractmethod
+    def record_result(self, result):
+        """Adds a finished game's result (1 / -1 / 0) to the score."""
+
+    @abstractmethod
+    def get_scores(self):
+        """Returns {"score_x": n, "score_o": n, "score_draws": n}."""
+
+    @abstractmethod
+    def get_result_totals(self):
+        """Same keys as get_scores(), counting every recorded result. Not cleared by reset()."""
+
+    @abstractmethod
+    def record_model_result(self, model, outcome):
+        """Counts a finished game for the model that played it; outcome is one of MODEL_OUTCOMES."""
+
+    @abstractmethod
+    def get_model_results(self):
+        """Returns {model: {"wins": n, "losses": n, "draws": n}}. Not cleared by reset()."""
+
+    @abstractmethod
+    def reset(self):
+        """Clears the score and every stored game."""
+
+    @abstractmethod
+    def __len__(self):
+        ...
+
+
+class MemorySessionStore(SessionStore):
+    """
+    In-process store. Unfinished and finished games live in two OrderedDicts,
+    each ordered by last update, so expiry and LRU eviction only ever pop
+    from the front: O(1) per game. Thread-safe; not shared between processes.
+    """
+
+    def __init__(self, max_games=DEFAULT_MAX_GAMES, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 finished_ttl_seconds=DEFAULT_FINISHED_TTL_SECONDS):
+        super().__init__()
+        self._lock = threading.RLock()
+        self._scores = dict.fromkeys(RESULT_SCORE_KEYS.values(), 0)
+        self._result_totals = dict.fromkeys(RESULT_SCORE_KEYS.values(), 0)
+        self.max_games = max_games
+        self.ttl_seconds = ttl_seconds
+        self.finished_ttl_seconds = finished_ttl_seconds
+        self._active = OrderedDict()    # game_id → (updated_at, session)
+        self._finished = OrderedDict()  # game_id → (updated_at, session)
+        self._model_results = {}  # model → {outcome: n}
+
+    def _evict(self, now):
+        for sessions, ttl in ((self._active, self.ttl_seconds), (self._finished, self.finished_ttl_seconds)):
+            while sessions:
+                updated_at, _ = next(iter(sessions.values()))
+                if now - updated_at < ttl:
+                    break
+                sessions.popitem(last=False)
+
+        # Over capacity: drop the oldest finished games first, then abandoned ones
+        while len(self) > self.max_games:
+            (self._finished or self._active).popitem(last=False)
+
+    @contextmanager
+    def locked(self, key):
+        with self._stripe(key):
+            yield
+
+    def get(self, game_id):
+        with self._lock:
+            self._evict(time.time())
+            entry = self._active.get(game_id) or self._finished.get(game_id)
+            return entry[1] if entry else None
+
+    def put(self, game_id, session):
+        with self._lock:
+            now = time.time()
+            self._active.pop(game_id, None)
+            self._finished.pop(game_id, None)
+            target = self._active if session["result"] is None else self._finished
+            target[game_id] = (now, session)
+            self._evict(now)
+
+    def find_unfinished(self):
+        with self._lock:
+            self._evict(time.time())
+            if not self._active:
+                return None
+            game_id, (_, session) = next(reversed(self._active.items()))
+            return game_id, session
+
+    def count_unfinished(self):
+        with self._lock:
+            self._evict(time.time())
+            return len(self._active)
+
+    def clear(self):
+        with self._lock:
+            self._active.clear()
+            self._finished.clear()
+
+    def record_result(self, result):
+        with self._lock:
+            self._scores[RESULT_SCORE_KEYS[result]] += 1
+            self._result_totals[RESULT_SCORE_KEYS[result]] += 1
+
+    def get_scores(self):
+        with self._lock:
+            return dict(self._scores)
+
+    def get_result_totals(self):
+        with self._lock:
+            return dict(self._result_totals)
+
+    def record_model_result(self, model, outcome):
+        with self._lock:
+            results = self._model_results.setdefault(model, dict.fromkeys(MODEL_OUTCOMES, 0))
+            results[outcome] += 1
+
+    def get_model_results(self):
+        with self._lock:
+            return {model: dict(results) for model, results in self._model_results.items()}
+
+    def reset(self):
+        with self._lock:
+            self.clear()
+            self._scores = dict.fromkeys(RESULT_SCORE_KEYS.values(), 0)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._active) + len(self._finished)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    File-backed store: sessions and the score survive restarts and are shared
+    by all worker processes. One connection per thread (reopened after fork);
+    WAL mode lets readers and a writer work concurrently. locked() holds a
+    write transaction (BEGIN IMMEDIATE), which serializes updates across
+    processes too.
+    """
+
+    EVICT_EVERY = 100  # puts between capacity checks (COUNT(*) is a table scan)
+
+    def __init__(self, path=DEFAULT_DB_PATH, max_games=DEFAULT_MAX_GAMES, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 finished_ttl_seconds=DEFAULT_FINISHED_TTL_SECONDS):
+        super().__init__()
+        self.path = path
+        self.max_games = max_games
+        self.ttl_seconds = ttl_seconds
+        self.finished_ttl_seconds = finished_ttl_seconds
+        self._local = threading.local()
+        self._puts = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS games (
+                    game_id TEXT PRIMARY KEY,
+                    x_mask INTEGER NOT NULL,
+                    o_mask INTEGER NOT NULL,
+                    current_player INTEGER NOT NULL,
+                    last_move INTEGER,
+                    result INTEGER,
+                    moves_played INTEGER NOT NULL,
+                    human_player INTEGER NOT NULL,
+                    model_player INTEGER NOT NULL,
+                    updated_at REAL NOT NULL,
+                    model TEXT,
+                    moves TEXT
+                )
+            """)
+            # Databases created before games were tied to a model and kept their moves
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(games)")]
+            for column in ("model", "moves"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE games ADD COLUMN {column} TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS games_updated_at ON games (updated_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS games_unfinished ON games (updated_at) WHERE result IS NULL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS scores (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    score_x INTEGER NOT NULL DEFAULT 0,
+                    score_o INTEGER NOT NULL DEFAULT 0,
+                    score_draws INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("INSERT OR IGNORE INTO scores (id) VALUES (0)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS result_totals (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    score_x INTEGER NOT NULL DEFAULT 0,
+                    score_o INTEGER NOT NULL DEFAULT 0,
+                    score_draws INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            # Databases created before the totals existed start from their current score
+            conn.execute("INSERT OR IGNORE INTO result_totals SELECT id, score_x, score_o, score_draws FROM scores")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS model_results (
+                    model TEXT PRIMARY KEY,
+                    wins INTEGER NOT NULL DEFAULT 0,
+                    losses INTEGER NOT NULL DEFAULT 0,
+                    draws INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+
+    def _connection(self):
+        # SQLite connections must not cross a fork: reopen in each process
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            self._local.in_transaction = False
+        return conn
+
+    @contextmanager
+    def _write(self):
+        """Commits on exit, unless already inside locked(), which commits at its end."""
+        conn = self._connection()
+        if self._local.in_transaction:
+            yield conn
+        else:
+            with conn:
+                yield conn
+
+    @contextmanager
+    def locked(self, key):
+        with self._stripe(key):
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            self._local.in_transaction = True
+            try:
+                yield
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                self._local.in_transaction = False
+
+    @staticmethod
+    def _to_session(row):
+        x_mask, o_mask, current_player, last_move, result, moves_played, human_player, model_player, model, moves = row
+        return {
+            "game": TicTacToe.from_masks(x_mask, o_mask, current_player),
+            "last_move": last_move,
+            "result": result,
+            "moves_played": moves_played,
+            "human_player": human_player,
+            "model_player": model_player,
+            "model": model,
+            "moves": [int(cell) for cell in moves] if moves is not None else None,
+        }
+
+    _COLUMNS = ("x_mask, o_mask, current_player, last_move, result, moves_played, human_player, model_player, "
+                "model, moves")
+
+    def _evict(self, conn, now):
+        conn.execute(
+            "DELETE FROM games WHERE (result IS NULL AND updated_at < ?) OR (result IS NOT NULL AND updated_at < ?)",
+            (now - self.ttl_seconds, now - self.finished_ttl_seconds),
+        )
+        (count,) = conn.execute("SELECT COUNT(*) FROM games").fetchone()
+        if count > self.max_games:
+            conn.execute(
+                "DELETE FROM games WHERE game_id IN ("
+                " SELECT game_id FROM games ORDER BY result IS NULL, updated_at LIMIT ?)",
+                (count - self.max_games,),
+            )
+
+    def get(self, game_id):
+        now = time.time()
+        row = self._connection().execute(
+            f"SELECT {self._COLUMNS} FROM games WHERE game_id = ? AND updated_at >= "
+            "CASE WHEN result IS NULL THEN ? ELSE ? END",
+            (game_id, now - self.ttl_seconds, now - self.finished_ttl_seconds),
+        ).fetchone()
+        return self._to_session(row) if row else None
+
+    def put(self, game_id, session):
+        game = session["game"]
+        now = time.time()
+        with self._write() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO games (game_id, {self._COLUMNS}, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (game_id, game.x_mask, game.o_mask, game.current_player, session["last_move"],
+                 session["result"], session["moves_played"], session["human_player"],
+                 session["model_player"], session.get("model"), _moves_text(session.get("moves")), now),
+            )
+            self._puts += 1
+            if self._puts % self.EVICT_EVERY == 0:
+                self._evict(conn, now)
+
+    def find_unfinished(self):
+        row = self._connection().execute(
+            f"SELECT game_id, {self._COLUMNS} FROM games WHERE result IS NULL AND updated_at >= ? "
+            "ORDER BY updated_at DESC LIMIT 1",
+            (time.time() - self.ttl_seconds,),
+        ).fetchone()
+        return (row[0], self._to_session(row[1:])) if row else None
+
+    def count_unfinished(self):
+        (count,) = self._connection().execute(
+            "SELECT COUNT(*) FROM games WHERE result IS NULL AND updated_at >= ?",
+            (time.time() - self.ttl_seconds,),
+        ).fetchone()
+        return count
+
+    def clear(self):
+        with self._write() as conn:
+            conn.execute("DELETE FROM games")
+
+    def record_result(self, result):
+        column = RESULT_SCORE_KEYS[result]
+        with self._write() as conn:
+            conn.execute(f"UPDATE scores SET {column} = {column} + 1 WHERE id = 0")
+            conn.execute(f"UPDATE result_totals SET {column} = {column} + 1 WHERE id = 0")
+
+    def get_scores(self):
+        row = self._connection().execute("SELECT score_x, score_o, score_draws FROM scores WHERE id = 0").fetchone()
+        return dict(zip(RESULT_SCORE_KEYS.values(), row))
+
+    def get_result_totals(self):
+        row = self._connection().execute(
+            "SELECT score_x, score_o, score_draws FROM result_totals WHERE id = 0").fetchone()
+        return dict(zip(RESULT_SCORE_KEYS.values(), row))
+
+    def record_model_result(self, model, outcome):
+        if outcome not in MODEL_OUTCOMES:
+            raise ValueError(f"Unknown outcome '{outcome}'")
+        with self._write() as conn:
+            conn.execute("INSERT OR IGNORE INTO model_results (model) VALUES (?)", (model,))
+            conn.execute(f"UPDATE model_results SET {outcome} = {outcome} + 1 WHERE model = ?", (model,))
+
+    def get_model_results(self):
+        rows = self._connection().execute("SELECT model, wins, losses, draws FROM model_results").fetchall()
+        return {row[0]: dict(zip(MODEL_OUTCOMES, row[1:])) for row in rows}
+
+    def reset(self):
+        with self._write() as conn:
+            conn.execute("DELETE FROM games")
+            conn.execute("UPDATE scores SET score_x = 0, score_o = 0, score_draws = 0 WHERE id = 0")
+
+    def __len__(self):
+        (count,) = self._connection().execute("SELECT COUNT(*) FROM games").fetchone()
+        return count
+
+
+def _moves_text(moves):
+    """Cells played as a digit string ("408" for 4, 0, 8)."""
+    return "".join(map(str, moves)) if moves is not None else None
+
+
+def create_session_store():
+    """
+    Builds the store selected by the environment:
+      SESSION_STORE=memory (default) | sqlite
+      SESSION_DB_PATH, SESSION_MAX_GAMES, SESSION_TTL_SECONDS, SESSION_FINISHED_TTL_SECONDS
+    """
+    kind = os.environ.get("SESSION_STORE", "memory")
+    options = {
+        "max_games": int(os.environ.get("SESSION_MAX_GAMES", DEFAULT_MAX_GAMES)),
+        "ttl_seconds": float(os.environ.get("SESSION_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+        "finished_ttl_seconds": float(os.environ.get("SESSION_FINISHED_TTL_SECONDS", DEFAULT_FINISHED_TTL_SECONDS)),
+    }
+    if kind == "memory":
+        return MemorySessionStore(**options)
+    if kind == "sqlite":
+        return SQLiteSessionStore(os.environ.get("SESSION_DB_PATH", DEFAULT_DB_PATH), **options)
+    raise ValueError(f"Unknown SESSION_STORE '{kind}', expected 'memory' or 'sqlite'")
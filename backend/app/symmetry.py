@@ -0,0 +1,116 @@
+# backend/app/symmetry.py
+
+import numpy as np
+
+from app.game import TicTacToe, _MASK_BASE3
+
+
+def _permutation(transform):
+    """Cell permutation p for a (row, col) → (row, col) map: new_board[i] = board[p[i]]."""
+    perm = [0] * 9
+    for cell in range(9):
+        r, c = transform(cell // 3, cell % 3)
+        perm[r * 3 + c] = cell
+    return tuple(perm)
+
+
+# The 8 symmetries of the square (dihedral group D4); index 0 is the identity
+TRANSFORMS = tuple(_permutation(f) for f in (
+    lambda r, c: (r, c),
+    lambda r, c: (c, 2 - r),      # rotate 90°
+    lambda r, c: (2 - r, 2 - c),  # rotate 180°
+    lambda r, c: (2 - c, r),      # rotate 270°
+    lambda r, c: (r, 2 - c),      # mirror left/right
+    lambda r, c: (2 - r, c),      # mirror top/bottom
+    lambda r, c: (c, r),          # main diagonal
+    lambda r, c: (2 - c, 2 - r),  # anti-diagonal
+))
+IDENTITY = 0
+
+# INVERSE[t][cell]: where an original cell ends up after transform t
+INVERSE = tuple(tuple(perm.index(cell) for cell in range(9)) for perm in TRANSFORMS)
+
+
+def _transform_mask(mask, perm):
+    return sum(1 << i for i, src in enumerate(perm) if mask >> src & 1)
+
+
+# _MASK_TRANSFORMS[t][mask] → mask after transform t
+_MASK_TRANSFORMS = tuple(
+    tuple(_transform_mask(m, perm) for m in range(1 << 9)) for perm in TRANSFORMS
+)
+
+
+def transform_board(board, t):
+    perm = TRANSFORMS[t]
+    return [board[perm[i]] for i in range(9)]
+
+
+def to_canonical_move(move, t):
+    """Maps a move on the original board to the same move on the transformed board."""
+    return INVERSE[t][move]
+
+
+def from_canonical_move(move, t):
+    """Maps a move on the transformed board back to the original board."""
+    return TRANSFORMS[t][move]
+
+
+def canonicalize_masks(x_mask, o_mask):
+    """
+    Returns (x_mask, o_mask, t) for the symmetric variant with the smallest
+    base-3 encoding; t is the transform that produced it.
+    """
+    best = None
+    for t, table in enumerate(_MASK_TRANSFORMS):
+        cx, co = table[x_mask], table[o_mask]
+        code = _MASK_BASE3[cx] + 2 * _MASK_BASE3[co]
+        if best is None or code < best[0]:
+            best = (code, cx, co, t)
+    return best[1], best[2], best[3]
+
+
+def canonical_encoding(x_mask, o_mask) -> int:
+    """Base-3 encoding shared by all 8 symmetric variants of a board."""
+    return min(
+        _MASK_BASE3[table[x_mask]] + 2 * _MASK_BASE3[table[o_mask]]
+        for table in _MASK_TRANSFORMS
+    )
+
+
+def canonicalize(game: TicTacToe):
+    """Returns (canonical TicTacToe, t). Map moves back with from_canonical_move(move, t)."""
+    cx, co, t = canonicalize_masks(game.x_mask, game.o_mask)
+    return TicTacToe.from_masks(cx, co, game.current_player), t
+
+
+def canonicalize_board(board):
+    """List-board version of canonicalize: returns (canonical board, t)."""
+    game = TicTacToe(board=board)
+    canonical, t = canonicalize(game)
+    return canonical.board, t
+
+
+# (8, 9) gather indexes for batched augmentation
+_PERM_ARRAY = np.array(TRANSFORMS)
+_INVERSE_ARRAY = np.array(INVERSE)
+
+
+def augment(boards, moves=None, values=None):
+    """
+    Expands a batch with all 8 symmetries (output is 8x the input length,
+    grouped by transform).
+
+    boards: [B, 9] array; moves: [B] cell indexes; values: [B, 9] per-cell
+    arrays (e.g. Q-vectors), permuted like the boards. Scalar per-sample
+    data (rewards, targets) is unchanged by symmetry: np.tile it 8 times.
+    Returns a tuple with the augmented versions of the arguments given.
+    """
+    boards = np.asarray(boards)
+    out = [boards[:, _PERM_ARRAY].transpose(1, 0, 2).reshape(-1, 9)]
+    if moves is not None:
+        out.append(_INVERSE_ARRAY[:, np.asarray(moves)].reshape(-1))
+    if values is not None:
+        values = np.asarray(values)
+        out.append(values[:, _PERM_ARRAY].transpose(1, 0, 2).reshape(-1, 9))
+    return tuple(out)
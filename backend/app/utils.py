@@ -0,0 +1,67 @@
+# backend/app/utils.py
+#
+# Move selection from Q-values, shared by serving, evaluation and training.
+# Works on one board (shape (9,)) or a batch (shape (N, 9)). Illegal cells
+# are masked out on the whole array, never by looping over cells in Python.
+# best_moves also accepts torch tensors and then stays in-tensor.
+
+import numpy as np
+
+
+def _is_tensor(x):
+    return type(x).__module__.startswith("torch")
+
+
+def masked_q_values(q_values, boards):
+    """Q-values with occupied cells set to -inf."""
+    if _is_tensor(q_values):
+        import torch
+        return q_values.masked_fill(torch.as_tensor(boards, device=q_values.device) != 0, float("-inf"))
+    return np.where(np.asarray(boards) == 0, q_values, -np.inf)
+
+
+def best_moves(q_values, boards):
+    """
+    Highest-valued legal move: an int for one board, int64[N] for a batch
+    (a LongTensor if q_values is a tensor). Ties go to the lowest cell.
+    """
+    moves = masked_q_values(q_values, boards).argmax(axis=-1)
+    if moves.ndim == 0:
+        return int(moves)
+    return moves
+
+
+def random_moves(boards, rng):
+    """One uniformly random legal move per board (rng: numpy Generator)."""
+    boards = np.asarray(boards)
+    noise = rng.random(boards.shape)
+    noise[boards != 0] = -1.0
+    moves = noise.argmax(axis=-1)
+    return int(moves) if moves.ndim == 0 else moves
+
+
+def sample_moves(q_values, boards, rng, epsilon=0.0, temperature=None):
+    """
+    Exploratory moves for a batch of boards:
+    temperature=None: epsilon-greedy, the best legal move, or with
+        probability epsilon a uniformly random legal one;
+    temperature=T: a legal move drawn from softmax(Q / T) (epsilon is ignored).
+    """
+    boards = np.asarray(boards)
+    if temperature is not None:
+        logits = masked_q_values(np.asarray(q_values, dtype=np.float64), boards) / temperature
+        weights = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        cumulative = np.cumsum(weights, axis=-1)
+        draws = rng.random(boards.shape[:-1] + (1,)) * cumulative[..., -1:]
+        # First cell whose cumulative weight exceeds the draw (never an illegal, zero-weight cell)
+        moves = (cumulative > draws).argmax(axis=-1)
+        return int(moves) if moves.ndim == 0 else moves
+
+    moves = best_moves(q_values, boards)
+    if boards.ndim == 1:
+        return random_moves(boards, rng) if rng.random() < epsilon else moves
+
+    explore = rng.random(len(boards)) < epsilon
+    if explore.any():
+        moves[explore] = random_moves(boards[explore], rng)
+    return moves
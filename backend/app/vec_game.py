@@ -0,0 +1,113 @@
+# backend/app/vec_game.py
+
+import numpy as np
+
+from app.game import RESULT_X_WINS, RESULT_O_WINS, RESULT_DRAW
+from app.utils import random_moves
+
+# The 8 winning lines as a (8, 3) index array into the flat board
+LINES = np.array([
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),
+    (0, 4, 8), (2, 4, 6),
+])
+
+
+class VecTicTacToe:
+    """
+    N independent games stepped together as NumPy arrays.
+
+    boards:         int8[N, 9]  (0 = empty, 1 = X, -1 = O)
+    current_player: int8[N]     (1 = X to move, -1 = O to move)
+
+    step() applies one move per game, detects wins/draws for the whole batch
+    and resets finished games to the empty board, so callers can keep
+    stepping without bookkeeping.
+    """
+
+    def __init__(self, num_envs: int, seed=None):
+        self.num_envs = num_envs
+        self.rng = np.random.default_rng(seed)
+        self.boards = np.zeros((num_envs, 9), dtype=np.int8)
+        self.current_player = np.ones(num_envs, dtype=np.int8)
+
+    def reset(self, mask=None):
+        if mask is None:
+            mask = slice(None)
+        self.boards[mask] = 0
+        self.current_player[mask] = 1
+
+    def legal_mask(self):
+        """bool[N, 9]: True where a move is legal."""
+        return self.boards == 0
+
+    def random_moves(self):
+        """One uniformly random legal move per game."""
+        return random_moves(self.boards, self.rng)
+
+    def results(self):
+        """
+        Returns (done, results): done is bool[N]; results holds RESULT_X_WINS,
+        RESULT_O_WINS or RESULT_DRAW for finished games (0 elsewhere).
+        """
+        line_sums = self.boards[:, LINES].sum(axis=2, dtype=np.int8)
+        x_wins = (line_sums == 3).any(axis=1)
+        o_wins = (line_sums == -3).any(axis=1)
+        full = (self.boards != 0).all(axis=1)
+
+        results = np.full(self.num_envs, RESULT_DRAW, dtype=np.int8)
+        results[x_wins] = RESULT_X_WINS
+        results[o_wins] = RESULT_O_WINS
+        return x_wins | o_wins | full, results
+
+    def step(self, moves):
+        """
+        Plays moves[i] in game i for the player to move. Illegal moves raise.
+        Returns (done, results, final_boards) where final_boards is a copy of
+        the boards before finished games were reset.
+        """
+        moves = np.asarray(moves)
+        rows = np.arange(self.num_envs)
+        if (self.boards[rows, moves] != 0).any():
+            raise ValueError("Invalid move: Cell already occupied.")
+
+        self.boards[rows, moves] = self.current_player
+        self.current_player = -self.current_player
+
+        done, results = self.results()
+        final_boards = self.boards.copy()
+        if done.any():
+            self.reset(done)
+        return done, results, final_boards
+
+
+def play_lockstep(policy_x, policy_o, num_games):
+    """
+    Plays num_games complete games from the empty board. Every ply, the side
+    to move picks the moves of all unfinished games in one call:
+    policy(boards int8[B, 9]) → moves int[B].
+
+    Returns (moves, results): moves is int8[N, 9], the cell played at each
+    ply (-1 after the game ended); results holds RESULT_X_WINS,
+    RESULT_O_WINS or RESULT_DRAW per game.
+    """
+    boards = np.zeros((num_games, 9), dtype=np.int8)
+    moves = np.full((num_games, 9), -1, dtype=np.int8)
+    results = np.full(num_games, RESULT_DRAW, dtype=np.int8)
+    active = np.arange(num_games)
+
+    for ply in range(9):
+        player = 1 if ply % 2 == 0 else -1
+        policy = policy_x if player == 1 else policy_o
+        chosen = np.asarray(policy(boards[active]), dtype=np.intp)
+        if (boards[active, chosen] != 0).any():
+            raise ValueError("Invalid move: Cell already occupied.")
+
+        boards[active, chosen] = player
+        moves[active, ply] = chosen
+        won = (boards[active][:, LINES].sum(axis=2) == 3 * player).any(axis=1)
+        results[active[won]] = RESULT_X_WINS if player == 1 else RESULT_O_WINS
+        active = active[~won]
+        if not len(active):
+            break
+    return moves, results
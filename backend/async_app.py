@@ -0,0 +1,9 @@
+import os
+
+from aiohttp import web
+
+from app.async_server import create_app
+
+if __name__ == '__main__':
+    # asyncio serving mode: same API as app.py, one event loop per process
+    web.run_app(create_app(), host='0.0.0.0', port=int(os.environ.get("PORT", "5000")))
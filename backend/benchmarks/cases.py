@@ -0,0 +1,258 @@
+# backend/benchmarks/cases.py
+#
+# Benchmark cases. Each case is a setup function returning `run(n)`, which
+# performs n operations; the runner (benchmarks/run_benchmarks.py) times it.
+# run(n) may return the seconds to count itself, to leave out per-op setup.
+# Inputs are generated from fixed seeds so every run measures the same work.
+
+import os
+import random
+
+import numpy as np
+
+from app.game import TicTacToe, play_game, RESULT_NOT_OVER
+from app.paths import MODELS_DIR
+
+SEED = 0
+NUM_POSITIONS = 1000
+BATCH_SIZE = 64
+MODEL_PATH = os.path.join(MODELS_DIR, "tictactoe_model_qlearning.pt")
+
+
+def _random_positions(count=NUM_POSITIONS, seed=SEED):
+    """Unfinished positions reached by random play, 0 to 8 moves deep."""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        game = TicTacToe()
+        for _ in range(rng.randrange(9)):
+            game = game.play_move(rng.choice(game.get_valid_move_indexes()))
+            if game.get_game_result() is not RESULT_NOT_OVER:
+                break
+        if game.get_game_result() is RESULT_NOT_OVER:
+            positions.append(game)
+    return positions
+
+
+def _cycle(items, n):
+    m = len(items)
+    return (items[i % m] for i in range(n))
+
+
+# Engine
+
+def engine_check_winner():
+    positions = _random_positions()
+
+    def run(n):
+        for game in _cycle(positions, n):
+            game.check_winner()
+    return run
+
+
+def engine_play_move():
+    positions = _random_positions()
+    moves = [game.get_valid_move_indexes()[0] for game in positions]
+    pairs = list(zip(positions, moves))
+
+    def run(n):
+        for game, move in _cycle(pairs, n):
+            game.play_move(move)
+    return run
+
+
+def engine_get_valid_move_indexes():
+    positions = _random_positions()
+
+    def run(n):
+        for game in _cycle(positions, n):
+            game.get_valid_move_indexes()
+    return run
+
+
+# Inference (one op = one forward pass of a 1- or BATCH_SIZE-board batch)
+
+def _boards(batch_size):
+    positions = _random_positions()
+    return np.array([game.board for game in positions[:batch_size]], dtype=np.float32)
+
+
+def _torch_forward(batch_size):
+    import torch
+    from app.model import load_model
+
+    model = load_model(MODEL_PATH)
+    boards = torch.from_numpy(_boards(batch_size))
+
+    def run(n):
+        with torch.no_grad():
+            for _ in range(n):
+                model(boards)
+    return run
+
+
+def _numpy_forward(batch_size):
+    from app.numpy_model import load_numpy_model
+
+    model = load_numpy_model(MODEL_PATH)
+    boards = _boards(batch_size)
+
+    def run(n):
+        for _ in range(n):
+            model(boards)
+    return run
+
+
+def inference_torch_single():
+    return _torch_forward(1)
+
+
+def inference_torch_batch():
+    return _torch_forward(BATCH_SIZE)
+
+
+def inference_numpy_single():
+    return _numpy_forward(1)
+
+
+def inference_numpy_batch():
+    return _numpy_forward(BATCH_SIZE)
+
+
+def inference_qtable_lookup():
+    from app.lookup import load_qtable
+
+    qtable = load_qtable(os.path.join(MODELS_DIR, "tictactoe_qtable.npz"), MODEL_PATH)
+    boards = [game.board for game in _random_positions()]
+
+    def run(n):
+        for board in _cycle(boards, n):
+            qtable.best_move(board)
+    return run
+
+
+# Training (one op = one SGD step on a BATCH_SIZE mini-batch)
+
+def training_backpropagate():
+    import torch
+    from train_qlearning import QLearningTrainer, TrainConfig
+
+    trainer = QLearningTrainer(TrainConfig(seed=SEED))
+    rng = np.random.default_rng(SEED)
+    boards = torch.from_numpy(_boards(BATCH_SIZE))
+    moves = torch.from_numpy(rng.integers(0, 9, size=BATCH_SIZE))
+    targets = torch.from_numpy(rng.random(BATCH_SIZE, dtype=np.float32))
+
+    def run(n):
+        for _ in range(n):
+            trainer.backpropagate(boards, moves, targets)
+    return run
+
+
+# Full games (one op = one play_game)
+
+def _players():
+    from app.lookup import load_qtable
+    from app.minimax import load_or_solve
+
+    qtable = load_qtable(os.path.join(MODELS_DIR, "tictactoe_qtable.npz"), MODEL_PATH)
+    minimax_table = load_or_solve()
+    return {
+        "random": lambda game: game.play_move(random.choice(game.get_valid_move_indexes())),
+        "q": lambda game: game.play_move(qtable.best_move(game.board)),
+        "minimax": lambda game: game.play_move(minimax_table.best_move(game)),
+    }
+
+
+def _play_game(player_x, player_o):
+    def setup():
+        players = _players()
+        random.seed(SEED)
+
+        def run(n):
+            for _ in range(n):
+                play_game(players[player_x], players[player_o])
+        return run
+    return setup
+
+
+# API (through the Flask test client)
+
+def api_move():
+    import time
+    from app import app
+
+    client = app.test_client()
+    rng = random.Random(SEED)
+
+    def run(n):
+        # Only /move calls count; /new_game between games is excluded from the time
+        spent = 0.0
+        done = 0
+        while done < n:
+            # /new_game resumes the unfinished game left by the previous run, if any
+            game = client.post("/new_game", json={"choice": 1}).get_json()
+            board = client.get("/state", query_string={"game_id": game["game_id"]}).get_json()["board"]
+            while done < n:
+                move = rng.choice([i for i, cell in enumerate(board) if cell == 0])
+                started = time.perf_counter()
+                response = client.post("/move", json={"game_id": game["game_id"], "move": move}).get_json()
+                spent += time.perf_counter() - started
+                done += 1
+                if response.get("result") is not None:
+                    break
+                board[move] = 1
+                board[response["model_move"]] = -1
+        return spent
+    return run
+
+
+def api_moves_batch():
+    import time
+    from app import app, service
+
+    client = app.test_client()
+
+    def new_games(count):
+        # Straight into the store: /new_game would resume the one unfinished game
+        game_ids = [service.games.new_id() for _ in range(count)]
+        for game_id in game_ids:
+            service.games.put(game_id, {
+                "game": TicTacToe(), "last_move": None, "result": None, "moves_played": 0,
+                "human_player": 1, "model_player": -1, "model": service.models.default_name,
+            })
+        return game_ids
+
+    def run(n):
+        # One op = one move inside a BATCH_SIZE-move /moves/batch request
+        spent = 0.0
+        done = 0
+        while done < n:
+            game_ids = new_games(min(BATCH_SIZE, n - done))
+            started = time.perf_counter()
+            client.post("/moves/batch", json={"moves": [{"game_id": game_id, "move": 4} for game_id in game_ids]})
+            spent += time.perf_counter() - started
+            done += len(game_ids)
+        return spent
+    return run
+
+
+# name → (setup, unit); units describe one op
+CASES = {
+    "engine.check_winner": (engine_check_winner, "calls"),
+    "engine.play_move": (engine_play_move, "calls"),
+    "engine.get_valid_move_indexes": (engine_get_valid_move_indexes, "calls"),
+    "inference.torch.batch1": (inference_torch_single, "forward passes"),
+    f"inference.torch.batch{BATCH_SIZE}": (inference_torch_batch, f"batches of {BATCH_SIZE}"),
+    "inference.numpy.batch1": (inference_numpy_single, "forward passes"),
+    f"inference.numpy.batch{BATCH_SIZE}": (inference_numpy_batch, f"batches of {BATCH_SIZE}"),
+    "inference.qtable.lookup": (inference_qtable_lookup, "lookups"),
+    "training.backpropagate": (training_backpropagate, "SGD steps"),
+    "play_game.random_vs_random": (_play_game("random", "random"), "games"),
+    "play_game.q_vs_random": (_play_game("q", "random"), "games"),
+    "play_game.random_vs_q": (_play_game("random", "q"), "games"),
+    "play_game.q_vs_minimax": (_play_game("q", "minimax"), "games"),
+    "play_game.minimax_vs_q": (_play_game("minimax", "q"), "games"),
+    "api.move": (api_move, "requests"),
+    "api.moves_batch": (api_moves_batch, "moves"),
+}
@@ -0,0 +1,185 @@
+# backend/benchmarks/run_benchmarks.py
+#
+# Runs the cases in benchmarks/cases.py and writes ops/second as JSON.
+# With --baseline, each result is compared to the stored one and the run
+# fails (exit code 1) if any case is slower than its regression threshold.
+# Baselines are machine-specific and not committed: record one with
+# --save-baseline on the machine (or in the image) that runs the comparison.
+#
+#   python benchmarks/run_benchmarks.py --output logs/benchmarks.json
+#   python benchmarks/run_benchmarks.py --save-baseline
+#   python benchmarks/run_benchmarks.py --baseline
+
+import sys
+import os
+import gc
+import json
+import time
+import platform
+import argparse
+import statistics
+
+# Ensure we can import from app.* and training/
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "training")))
+
+# The API cases would otherwise log every game at INFO and append it to logs/games.bin
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("GAME_LOG_PATH", "")
+
+import numpy as np
+
+from benchmarks.cases import CASES
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+TARGET_SECONDS = 0.2  # per repeat, after calibration
+REPEATS = 5
+DEFAULT_THRESHOLD = 0.25  # fail when more than 25% below baseline
+THRESHOLDS = {
+    # Noisier cases (allocation, Flask/Werkzeug request handling)
+    "api.move": 0.40,
+    "training.backpropagate": 0.40,
+}
+
+
+def _timed(run, n):
+    # Like timeit: no garbage collection pauses inside the timed region
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        counted = run(n)
+        elapsed = time.perf_counter() - started
+    finally:
+        gc.enable()
+    return counted if counted is not None else elapsed
+
+
+def measure(run, target_seconds=TARGET_SECONDS, repeats=REPEATS):
+    """Calibrates n so one repeat takes ~target_seconds, then returns the ops/second of each repeat."""
+    n = 1
+    while True:
+        elapsed = _timed(run, n)
+        if elapsed >= target_seconds / 10:
+            break
+        n *= 4
+    n = max(1, int(n * target_seconds / elapsed))
+    return [n / _timed(run, n) for _ in range(repeats)]
+
+
+def environment():
+    import torch
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "torch": torch.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "torch_threads": torch.get_num_threads(),
+    }
+
+
+def run_benchmarks(names, target_seconds=TARGET_SECONDS, repeats=REPEATS):
+    results = {}
+    for name in names:
+        setup, unit = CASES[name]
+        samples = measure(setup(), target_seconds, repeats)
+        # The fastest repeat is the least disturbed by other load on the machine
+        results[name] = {
+            "ops_per_sec": max(samples),
+            "median_ops_per_sec": statistics.median(samples),
+            "unit": unit,
+        }
+        print(f"⏱️ {name:<34} {results[name]['ops_per_sec']:>14,.0f} {unit}/s")
+    return results
+
+
+def environment_changes(baseline_environment, current_environment):
+    """Returns [(key, baseline value, current value)] for the environment fields that differ."""
+    return [
+        (key, baseline_environment.get(key), value)
+        for key, value in current_environment.items()
+        if baseline_environment.get(key) != value
+    ]
+
+
+def compare(results, baseline, default_threshold=DEFAULT_THRESHOLD):
+    """Returns [(name, ratio, threshold, regressed)] for cases present in both."""
+    rows = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result["ops_per_sec"] / baseline[name]["ops_per_sec"]
+        threshold = THRESHOLDS.get(name, default_threshold)
+        rows.append((name, ratio, threshold, ratio < 1.0 - threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the backend benchmarks.")
+    parser.add_argument("--only", action="append", default=[], metavar="PREFIX",
+                        help="run cases whose name starts with PREFIX (repeatable)")
+    parser.add_argument("--output", default=None, help="write results JSON here")
+    parser.add_argument("--baseline", nargs="?", const=BASELINE_PATH, default=None,
+                        help=f"compare against a baseline JSON (default {BASELINE_PATH})")
+    parser.add_argument("--save-baseline", "--update-baseline", action="store_true",
+                        help=f"merge the results into {BASELINE_PATH} (local, not committed)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction, for cases without their own threshold")
+    parser.add_argument("--seconds", type=float, default=TARGET_SECONDS, help="target time per repeat")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    args = parser.parse_args()
+
+    # Single-threaded torch: comparable across machines and runs
+    import torch
+    torch.set_num_threads(1)
+
+    names = [name for name in CASES if not args.only or any(name.startswith(p) for p in args.only)]
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment(),
+        "results": run_benchmarks(names, args.seconds, args.repeats),
+    }
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Results saved to: {args.output}")
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH) as f:
+                stored = json.load(f)
+            # Results from another environment are not comparable: start over rather than mix them
+            if not environment_changes(stored.get("environment", {}), report["environment"]):
+                baseline = stored["results"]
+        baseline.update(report["results"])
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(dict(report, results=baseline), f, indent=2)
+        print(f"💾 Baseline saved: {BASELINE_PATH}")
+
+    if args.baseline:
+        if not os.path.exists(args.baseline):
+            print(f"❌ No baseline at {args.baseline}: record one on this machine with --save-baseline")
+            sys.exit(2)
+        with open(args.baseline) as f:
+            stored = json.load(f)
+        changes = environment_changes(stored.get("environment", {}), report["environment"])
+        for key, recorded, current in changes:
+            print(f"⚠️ Baseline {key} was {recorded}, this run has {current}")
+        if changes:
+            print("⚠️ Ratios against a baseline from another environment are not meaningful")
+        rows = compare(report["results"], stored["results"], args.threshold)
+        print("\n📊 Compared to baseline:")
+        for name, ratio, threshold, regressed in rows:
+            mark = "❌" if regressed else "✅"
+            print(f"{mark} {name:<34} {ratio:>6.2f}x  (fails below {1 - threshold:.2f}x)")
+        if any(regressed for *_, regressed in rows):
+            print("\n❌ Performance regression detected.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
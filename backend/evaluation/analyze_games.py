@@ -0,0 +1,160 @@
+# backend/evaluation/analyze_games.py
+#
+# Streaming analysis of a binary game log (app/game_records.py). The log is
+# memory-mapped and decoded in chunks; all counters are fixed-size arrays,
+# so memory stays constant however many games the log holds.
+#
+#   python evaluation/analyze_games.py summary
+#   python evaluation/analyze_games.py openings --depth 2
+#   python evaluation/analyze_games.py blunders --agent qlearning
+#
+# Logs come from the API (logs/games.bin, see GAME_LOG_PATH) and from
+# python evaluation/parallel_eval.py --record PATH.
+
+import os
+import sys
+import argparse
+
+import numpy as np
+
+# Ensure we can import from app.*
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.game import TicTacToe, RESULT_X_WINS, RESULT_O_WINS, RESULT_DRAW
+from app.game_records import MAX_AGENTS, iter_games, read_agents, replay
+from app.lookup import NUM_ENCODINGS, encode_boards
+from app.paths import LOGS_DIR
+
+GAME_LOG_PATH = os.path.join(LOGS_DIR, "games.bin")
+RESULTS = (RESULT_X_WINS, RESULT_O_WINS, RESULT_DRAW)
+VALUE_NAMES = {1: "win", 0: "draw", -1: "loss"}
+
+
+def summarize(path):
+    """Games, results and total moves per (x_agent, o_agent) pair."""
+    counts = np.zeros((MAX_AGENTS, MAX_AGENTS, len(RESULTS)), dtype=np.int64)
+    moves = np.zeros((MAX_AGENTS, MAX_AGENTS), dtype=np.int64)
+    for games in iter_games(path):
+        for i, result in enumerate(RESULTS):
+            won = games["result"] == result
+            np.add.at(counts[:, :, i], (games["x_agent"][won], games["o_agent"][won]), 1)
+        np.add.at(moves, (games["x_agent"], games["o_agent"]), games["num_moves"])
+    return counts, moves
+
+
+def opening_stats(path, depth):
+    """Games and results per opening (the first `depth` moves), indexed by the moves as base-9 digits."""
+    counts = np.zeros((9 ** depth, len(RESULTS)), dtype=np.int64)
+    weights = 9 ** np.arange(depth)
+    for games in iter_games(path):
+        games = games[games["num_moves"] >= depth]
+        keys = games["moves"][:, :depth].astype(np.int64) @ weights
+        for i, result in enumerate(RESULTS):
+            counts[:, i] += np.bincount(keys[games["result"] == result], minlength=len(counts))
+    return counts
+
+
+def find_blunders(path, agent_id, perfect_play):
+    """
+    Replays every move of `agent_id` against the perfect-play values.
+    Returns (moves counted, blunders[3**9 * 9]): how often each (position,
+    move) pair threw away value, i.e. turned a win into a draw/loss or a
+    draw into a loss for the side to move.
+    """
+    values = perfect_play.values.astype(np.int64)
+    blunders = np.zeros(NUM_ENCODINGS * 9, dtype=np.int64)
+    total = 0
+    for games in iter_games(path):
+        for ply, rows, boards, moves in replay(games):
+            mover = games["x_agent"][rows] if ply % 2 == 0 else games["o_agent"][rows]
+            mine = mover == agent_id
+            if not mine.any():
+                continue
+            boards, moves = boards[mine], moves[mine]
+            before = encode_boards(boards)
+            after = before + np.where(ply % 2 == 0, 1, 2) * 3 ** moves
+            # Values are for the side to move: after the move that is the opponent
+            lost = -values[after] < values[before]
+            np.add.at(blunders, before[lost] * 9 + moves[lost], 1)
+            total += len(moves)
+    return total, blunders
+
+
+def _board_from_code(code):
+    cells = [(code // 3 ** i) % 3 for i in range(9)]
+    return [1 if cell == 1 else -1 if cell == 2 else 0 for cell in cells]
+
+
+def print_summary(path):
+    agents = read_agents(path)
+    counts, moves = summarize(path)
+    games = counts.sum(axis=2)
+    print(f"📚 {int(games.sum())} games in {path}")
+    for x_id, o_id in zip(*np.nonzero(games)):
+        x_wins, o_wins, draws = counts[x_id, o_id]
+        n = games[x_id, o_id]
+        print(f"🎮 {agents[x_id]} (X) vs {agents[o_id]} (O): {n} games, X {x_wins / n:.2%}, "
+              f"O {o_wins / n:.2%}, draw {draws / n:.2%}, {moves[x_id, o_id] / n:.2f} moves/game")
+
+
+def print_openings(path, depth, top):
+    counts = opening_stats(path, depth)
+    totals = counts.sum(axis=1)
+    print(f"📖 Top {top} openings ({depth} moves):")
+    for key in np.argsort(-totals)[:top]:
+        if totals[key] == 0:
+            break
+        opening = [int(key // 9 ** i) % 9 for i in range(depth)]
+        x_wins, o_wins, draws = counts[key] / totals[key]
+        print(f"   {' '.join(map(str, opening)):<{2 * depth}} {totals[key]:>10} games  "
+              f"X {x_wins:.2%}  O {o_wins:.2%}  draw {draws:.2%}")
+
+
+def print_blunders(path, agent, top):
+    from app.minimax import load_or_solve
+
+    agents = read_agents(path)
+    if agent not in agents:
+        print(f"❌ Agent '{agent}' not in {path} (agents: {', '.join(agents) or 'none'})")
+        return
+    perfect_play = load_or_solve()
+    total, blunders = find_blunders(path, agents.index(agent), perfect_play)
+    print(f"🔍 {agent}: {int(blunders.sum())} blunders in {total} moves "
+          f"({blunders.sum() / max(total, 1):.3%})")
+
+    for key in np.argsort(-blunders)[:top]:
+        if blunders[key] == 0:
+            break
+        code, move = divmod(int(key), 9)
+        board = _board_from_code(code)
+        game = TicTacToe(board, current_player=1 if board.count(1) == board.count(-1) else -1)
+        best = perfect_play.value(game)
+        after = -perfect_play.value(game.play_move(move))
+        print(f"\n⚠️ {blunders[key]}× played {move} ({VALUE_NAMES[np.sign(best)]} → {VALUE_NAMES[np.sign(after)]}), "
+              f"best {perfect_play.best_move(game)}; {game.get_player_symbol()} to move:")
+        game.print_board()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a binary game log.")
+    parser.add_argument("--log", default=GAME_LOG_PATH, help=f"game log (default {GAME_LOG_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("summary", help="games and results per pair of agents")
+    openings = commands.add_parser("openings", help="most played openings and their results")
+    openings.add_argument("--depth", type=int, default=2, choices=range(1, 5))
+    openings.add_argument("--top", type=int, default=20)
+    blunders = commands.add_parser("blunders", help="positions where an agent lost value against perfect play")
+    blunders.add_argument("--agent", required=True, help="agent name, e.g. a served model's name or 'q'")
+    blunders.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == "summary":
+        print_summary(args.log)
+    elif args.command == "openings":
+        print_openings(args.log, args.depth, args.top)
+    else:
+        print_blunders(args.log, args.agent, args.top)
+
+
+if __name__ == "__main__":
+    main()
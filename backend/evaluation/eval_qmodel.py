@@ -2,30 +2,17 @@
 
 import os
 import sys
-import torch
 import random
 
 # Ensure we can import from app.*
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from app.model import TicTacToeNet
+from app.numpy_model import cached_predictor
+from app.utils import best_moves
 from app.game import TicTacToe, play_game, RESULT_X_WINS, RESULT_O_WINS, RESULT_DRAW
 
-# Load trained model
-MODEL_PATH = os.path.join("models", "tictactoe_model_qlearning.pt")
-model = TicTacToeNet()
-model.load_state_dict(torch.load(MODEL_PATH))
-model.eval()
-
-def board_to_tensor(board):
-    return torch.tensor(board, dtype=torch.float32)
-
 def get_q_move(game: TicTacToe):
-    with torch.no_grad():
-        q_values = model(board_to_tensor(game.board))
-        valid_moves = game.get_valid_move_indexes()
-        best_move = max(valid_moves, key=lambda i: q_values[i].item())
-    return game.play_move(best_move)
+    return game.play_move(best_moves(cached_predictor()(game.board), game.board))
 
 def random_move(game: TicTacToe):
     move = random.choice(game.get_valid_move_indexes())
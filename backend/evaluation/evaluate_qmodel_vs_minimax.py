@@ -3,58 +3,30 @@
 import os
 import sys
 import csv
-import torch
 
 # Ensure imports like app.model work
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from app.model import TicTacToeNet
+from app.numpy_model import cached_predictor
+from app.utils import best_moves
 from app.game import TicTacToe, play_game, RESULT_X_WINS, RESULT_O_WINS, RESULT_DRAW
+from app.minimax import MINIMAX_TABLE_PATH, load_or_solve
+from app.paths import LOGS_DIR
 
-# Load trained model
-MODEL_PATH = os.path.join("models", "tictactoe_model_qlearning.pt")
-model = TicTacToeNet()
-model.load_state_dict(torch.load(MODEL_PATH))
-model.eval()
+# Perfect-play table for every reachable board (solved once, then loaded from disk), loaded on first use
+_minimax_table = None
 
-def board_to_tensor(board):
-    return torch.tensor(board, dtype=torch.float32)
+def minimax_table():
+    global _minimax_table
+    if _minimax_table is None:
+        _minimax_table = load_or_solve(MINIMAX_TABLE_PATH)
+    return _minimax_table
 
 def get_q_move(game: TicTacToe):
-    with torch.no_grad():
-        q_values = model(board_to_tensor(game.board))
-        valid_moves = game.get_valid_move_indexes()
-        best_move = max(valid_moves, key=lambda i: q_values[i].item())
-    return game.play_move(best_move)
+    return game.play_move(best_moves(cached_predictor()(game.board), game.board))
 
 def get_minimax_move(game: TicTacToe):
-    def minimax(board, player):
-        winner = board.check_winner()
-        if winner == 1:
-            return 1
-        elif winner == -1:
-            return -1
-        elif board.is_full():
-            return 0
-
-        scores = []
-        for move in board.get_valid_move_indexes():
-            new_board = board.play_move(move)
-            score = minimax(new_board, -player)
-            scores.append(score)
-
-        return max(scores) if player == 1 else min(scores)
-
-    best_score = float('-inf')
-    best_move = None
-    for move in game.get_valid_move_indexes():
-        new_game = game.play_move(move)
-        score = minimax(new_game, -game.current_player)
-        if score > best_score:
-            best_score = score
-            best_move = move
-
-    return game.play_move(best_move)
+    return game.play_move(minimax_table().best_move(game))
 
 def evaluate(player_x, player_o, num_games=1000, label=""):
     results = {RESULT_X_WINS: 0, RESULT_O_WINS: 0, RESULT_DRAW: 0}
@@ -106,4 +78,4 @@ if __name__ == "__main__":
         "Q-model (X) vs Minimax (O)": results_1,
         "Minimax (X) vs Q-model (O)": results_2,
     }
-    save_results(all_results, os.path.join("logs", "qmodel_vs_minimax_log.csv"))
+    save_results(all_results, os.path.join(LOGS_DIR, "qmodel_vs_minimax_log.csv"))
@@ -0,0 +1,110 @@
+# backend/evaluation/exact_eval.py
+
+import os
+import sys
+from fractions import Fraction
+
+# Ensure we can import from app.*
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.game import TicTacToe, RESULT_X_WINS, RESULT_O_WINS, RESULT_DRAW, RESULT_NOT_OVER
+
+# A policy maps a game to {move: probability}. It must depend only on the
+# board (not on history), which is what makes subtree results reusable.
+
+
+def random_policy(game: TicTacToe):
+    moves = game.get_valid_move_indexes()
+    p = Fraction(1, len(moves))
+    return {move: p for move in moves}
+
+
+def deterministic_policy(player):
+    """Wraps a player (game → next game, e.g. get_q_move) as a policy."""
+    def policy(game: TicTacToe):
+        next_game = player(game)
+        placed = (next_game.x_mask | next_game.o_mask) ^ (game.x_mask | game.o_mask)
+        return {placed.bit_length() - 1: Fraction(1)}
+    return policy
+
+
+def optimal_policy(table):
+    """
+    Perfect play that picks uniformly among *all* optimal moves (from a
+    PerfectPlayTable), so evaluation covers every line a perfect opponent
+    might choose rather than just the table's single best move.
+    """
+    def policy(game: TicTacToe):
+        best = table.value(game)
+        moves = [move for move in game.get_valid_move_indexes() if -table.value(game.play_move(move)) == best]
+        p = Fraction(1, len(moves))
+        return {move: p for move in moves}
+    return policy
+
+
+def evaluate_exact(player_x, player_o, losing_for=None):
+    """
+    Walks the game tree once, weighting each branch by the policies' move
+    probabilities, and memoizes every subtree by board encoding.
+
+    player_x, player_o: policies (see random_policy / deterministic_policy)
+    losing_for: 1 or -1 to also collect every line in which that side loses
+
+    Returns (probabilities, losing_lines):
+      probabilities: {RESULT_X_WINS: p, RESULT_O_WINS: p, RESULT_DRAW: p} as Fractions
+      losing_lines:  [(moves, p)], moves being the full move sequence of the game
+    """
+    losing_result = {1: RESULT_O_WINS, -1: RESULT_X_WINS}.get(losing_for)
+    memo = {}
+
+    def walk(game):
+        code = game.encode()
+        if code in memo:
+            return memo[code]
+
+        result = game.get_game_result()
+        if result is not RESULT_NOT_OVER:
+            probs = {RESULT_X_WINS: Fraction(0), RESULT_O_WINS: Fraction(0), RESULT_DRAW: Fraction(0)}
+            probs[result] = Fraction(1)
+            lines = [((), Fraction(1))] if result == losing_result else []
+            memo[code] = (probs, lines)
+            return memo[code]
+
+        policy = player_x if game.current_player == 1 else player_o
+        probs = {RESULT_X_WINS: Fraction(0), RESULT_O_WINS: Fraction(0), RESULT_DRAW: Fraction(0)}
+        lines = []
+        for move, p in policy(game).items():
+            if p == 0:
+                continue
+            child_probs, child_lines = walk(game.play_move(move))
+            for key, value in child_probs.items():
+                probs[key] += p * value
+            lines.extend(((move,) + suffix, p * q) for suffix, q in child_lines)
+
+        memo[code] = (probs, lines)
+        return memo[code]
+
+    return walk(TicTacToe())
+
+
+def print_exact_summary(probabilities, losing_lines, label, max_lines=10):
+    print(f"\n🎯 Exact results for {label}:")
+    print(f"✅ X Wins:   {float(probabilities[RESULT_X_WINS]):.4%}")
+    print(f"❌ O Wins:   {float(probabilities[RESULT_O_WINS]):.4%}")
+    print(f"🤝 Draws:    {float(probabilities[RESULT_DRAW]):.4%}")
+    if losing_lines:
+        print(f"💥 {len(losing_lines)} losing lines (most likely first):")
+        for moves, p in sorted(losing_lines, key=lambda line: -line[1])[:max_lines]:
+            print(f"   {' → '.join(str(m) for m in moves)}   p={float(p):.4%}")
+
+
+if __name__ == "__main__":
+    from evaluate_qmodel_vs_minimax import get_q_move, get_minimax_move
+
+    q_policy = deterministic_policy(get_q_move)
+    minimax_policy = deterministic_policy(get_minimax_move)
+
+    print_exact_summary(*evaluate_exact(q_policy, random_policy, losing_for=1), "Q-model (X) vs Random (O)")
+    print_exact_summary(*evaluate_exact(random_policy, q_policy, losing_for=-1), "Random (X) vs Q-model (O)")
+    print_exact_summary(*evaluate_exact(q_policy, minimax_policy, losing_for=1), "Q-model (X) vs Minimax (O)")
+    print_exact_summary(*evaluate_exact(minimax_policy, q_policy, losing_for=-1), "Minimax (X) vs Q-model (O)")
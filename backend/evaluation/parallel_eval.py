@@ -0,0 +1,139 @@
+# backend/evaluation/parallel_eval.py
+
+import os
+import sys
+import random
+import argparse
+import multiprocessing as mp
+
+# Ensure we can import from app.*
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.game import play_game, RESULT_X_WINS, RESULT_O_WINS, RESULT_DRAW
+from app.minimax import MINIMAX_TABLE_PATH, load_or_solve
+from app.numpy_model import MODEL_BACKEND, MODEL_BACKENDS
+from app.paths import MODELS_DIR, LOGS_DIR
+
+MODEL_PATH = os.path.join(MODELS_DIR, "tictactoe_model_qlearning.pt")
+LOG_PATH = os.path.join(LOGS_DIR, "parallel_eval_log.csv")
+
+PLAYER_NAMES = ("q", "random", "minimax")
+DEFAULT_MATCHUPS = [
+    ("Q-model (X) vs Random (O)", "q", "random"),
+    ("Random (X) vs Q-model (O)", "random", "q"),
+    ("Q-model (X) vs Minimax (O)", "q", "minimax"),
+    ("Minimax (X) vs Q-model (O)", "minimax", "q"),
+]
+
+# Per-process players (and game log writer), filled once by _init_worker
+_players = {}
+_game_log = None
+
+
+def _init_worker(model_path, minimax_table_path, backend=None, record_path=None):
+    """Runs once per worker: loads the model and the perfect-play table."""
+    global _game_log
+    from app.numpy_model import load_predictor
+    from app.lookup import build_qtable
+
+    if (backend or MODEL_BACKEND) == "torch":
+        import torch
+        torch.set_num_threads(1)
+    model = load_predictor(model_path, backend=backend)
+
+    # One batched forward pass over every reachable board; moves are then lookups
+    qtable = build_qtable(model)
+    minimax_table = load_or_solve(minimax_table_path)
+
+    _players["q"] = lambda game: game.play_move(qtable.best_move(game.board))
+    _players["random"] = lambda game: game.play_move(random.choice(game.get_valid_move_indexes()))
+    _players["minimax"] = lambda game: game.play_move(minimax_table.best_move(game))
+    if record_path:
+        from app.game_records import GameRecordWriter
+        _game_log = GameRecordWriter(record_path)
+
+
+def _play_shard(task):
+    player_x, player_o, num_games, seed = task
+    random.seed(seed)
+    results = {RESULT_X_WINS: 0, RESULT_O_WINS: 0, RESULT_DRAW: 0}
+
+    def log_game(moves, result):
+        _game_log.append(moves, result, player_x, player_o)
+
+    record = log_game if _game_log is not None else None
+    for _ in range(num_games):
+        final_state = play_game(_players[player_x], _players[player_o], record=record)
+        results[final_state.get_game_result()] += 1
+    if _game_log is not None:
+        _game_log.flush()  # pool workers are not closed cleanly
+    return results
+
+
+def _shard_sizes(num_games, shard_size):
+    full, rest = divmod(num_games, shard_size)
+    return [shard_size] * full + ([rest] if rest else [])
+
+
+def run_matchups(matchups, num_games=1000, workers=None, seed=0, shard_size=1000,
+                 model_path=MODEL_PATH, minimax_table_path=MINIMAX_TABLE_PATH, backend=None, record_path=None):
+    """
+    Plays num_games per matchup on a process pool and merges the counts.
+
+    matchups: list of (label, player_x_name, player_o_name)
+    Each shard is seeded with seed + its index, so results are reproducible
+    regardless of worker count or scheduling.
+    record_path: optional game log (app/game_records.py) every game is appended to.
+    Returns {label: {RESULT_X_WINS: n, RESULT_O_WINS: n, RESULT_DRAW: n}}.
+    """
+    for _, player_x, player_o in matchups:
+        for name in (player_x, player_o):
+            if name not in PLAYER_NAMES:
+                raise ValueError(f"Unknown player '{name}', expected one of {PLAYER_NAMES}")
+
+    tasks = []
+    shard_index = 0
+    for label, player_x, player_o in matchups:
+        for size in _shard_sizes(num_games, shard_size):
+            tasks.append((label, (player_x, player_o, size, seed + shard_index)))
+            shard_index += 1
+
+    all_results = {label: {RESULT_X_WINS: 0, RESULT_O_WINS: 0, RESULT_DRAW: 0} for label, _, _ in matchups}
+    with mp.Pool(workers, initializer=_init_worker, initargs=(model_path, minimax_table_path, backend, record_path)) as pool:
+        shard_results = pool.map(_play_shard, [task for _, task in tasks])
+
+    for (label, _), results in zip(tasks, shard_results):
+        for result, count in results.items():
+            all_results[label][result] += count
+    return all_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the Q-model on a process pool.")
+    parser.add_argument("--games", type=int, default=1000, help="games per matchup")
+    parser.add_argument("--workers", type=int, default=None, help="pool size (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--shard-size", type=int, default=1000)
+    parser.add_argument("--log", default=LOG_PATH)
+    parser.add_argument("--backend", choices=MODEL_BACKENDS, default=MODEL_BACKEND,
+                        help="inference backend used to build the Q-model's lookup table")
+    parser.add_argument("--record", default=None, metavar="PATH",
+                        help="append every game to a binary game log (see evaluation/analyze_games.py)")
+    args = parser.parse_args()
+
+    from evaluate_qmodel_vs_minimax import save_results, print_summary
+
+    print(f"🚀 Evaluating {len(DEFAULT_MATCHUPS)} matchups × {args.games} games "
+          f"on {args.workers or os.cpu_count()} workers...")
+    all_results = run_matchups(DEFAULT_MATCHUPS, num_games=args.games, workers=args.workers,
+                               seed=args.seed, shard_size=args.shard_size, backend=args.backend,
+                               record_path=args.record)
+    for label, results in all_results.items():
+        print_summary(results, label)
+
+    save_results(all_results, args.log)
+    print(f"\n📄 Results saved to: {args.log}")
+
+
+if __name__ == "__main__":
+    main()
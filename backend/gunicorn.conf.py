@@ -0,0 +1,34 @@
+# backend/gunicorn.conf.py
+# Production entry point: gunicorn -c gunicorn.conf.py app:app
+
+import os
+import sys
+import multiprocessing
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+worker_class = "gthread"
+timeout = 30
+
+# Import the app (and load the Q-table / model) once in the master; workers
+# are forked from it and share those pages copy-on-write. The warm-up must
+# finish before the fork (a background warm-up thread would not survive it).
+preload_app = True
+os.environ.setdefault("MODEL_WARMUP", "eager")
+
+# Each worker gets its own small share of the cores for torch/BLAS math
+TORCH_THREADS = int(os.environ.get("TORCH_THREADS", "1"))
+os.environ.setdefault("OMP_NUM_THREADS", str(TORCH_THREADS))
+os.environ.setdefault("MKL_NUM_THREADS", str(TORCH_THREADS))
+
+# Per-process memory would split games and scores between workers, so
+# multi-worker deployments share them through SQLite by default
+if workers > 1:
+    os.environ.setdefault("SESSION_STORE", "sqlite")
+
+
+def post_fork(server, worker):
+    if "torch" in sys.modules:
+        import torch
+        torch.set_num_threads(TORCH_THREADS)
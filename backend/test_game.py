@@ -1,23 +1,9 @@
 from app.game import TicTacToe
-from app.model import TicTacToeNet
-import torch
-import os
-
-# Load trained model
-MODEL_PATH = os.path.join("models", "tictactoe_model_qlearning.pt")
-model = TicTacToeNet()
-model.load_state_dict(torch.load(MODEL_PATH))
-model.eval()
-
-def board_to_tensor(board):
-    return torch.tensor(board, dtype=torch.float32)
+from app.numpy_model import cached_predictor
+from app.utils import best_moves
 
 def get_model_move(game: TicTacToe):
-    with torch.no_grad():
-        q_values = model(board_to_tensor(game.board))
-        valid_moves = game.get_valid_move_indexes()
-        best_move = max(valid_moves, key=lambda i: q_values[i].item())
-    return best_move
+    return best_moves(cached_predictor()(game.board), game.board)
 
 def main():
     game = TicTacToe()
@@ -0,0 +1,72 @@
+# backend/tests/test_batching.py
+#
+#   python -m pytest tests
+
+import os
+import sys
+import json
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NUM_GAMES = 40
+
+# INFERENCE_MODE and SESSION_STORE are read when app.service is imported, hence a fresh process
+CONCURRENT_MOVES = f"""
+import json
+import threading
+from app.routes import app
+from app import service
+from app.game import TicTacToe
+
+game_ids = [service.games.new_id() for _ in range({NUM_GAMES})]
+for game_id in game_ids:
+    service.games.put(game_id, {{
+        "game": TicTacToe(), "last_move": None, "result": None, "moves_played": 0,
+        "human_player": 1, "model_player": -1, "model": service.models.default_name, "moves": [],
+    }})
+
+barrier = threading.Barrier(len(game_ids))
+statuses = []
+
+def move(game_id):
+    barrier.wait()
+    statuses.append(app.test_client().post("/move", json={{"game_id": game_id, "move": 4}}).status_code)
+
+threads = [threading.Thread(target=move, args=(game_id,)) for game_id in game_ids]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+batch_sizes = service.models.get(service.models.default_name).batcher.batch_sizes
+print(json.dumps({{"statuses": statuses, "batch_sizes": batch_sizes}}))
+"""
+
+
+def run_concurrent_moves(tmp_path, session_store):
+    env = dict(
+        os.environ,
+        PYTHONPATH=BACKEND_DIR,
+        INFERENCE_MODE="batched",
+        SESSION_STORE=session_store,
+        SESSION_DB_PATH=str(tmp_path / "sessions.sqlite3"),
+        MODEL_WARMUP="eager",
+        BATCH_MAX_WAIT_MS="50",
+        LOG_LEVEL="WARNING",
+        GAME_LOG_PATH="",
+    )
+    output = subprocess.run([sys.executable, "-c", CONCURRENT_MOVES], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def test_concurrent_moves_share_batches_on_sqlite_store(tmp_path):
+    # The store gunicorn uses with more than one worker (gunicorn.conf.py)
+    report = run_concurrent_moves(tmp_path, "sqlite")
+    assert report["statuses"] == [200] * NUM_GAMES
+    assert max(int(size) for size in report["batch_sizes"]) > 1
+
+
+def test_concurrent_moves_share_batches_on_memory_store(tmp_path):
+    report = run_concurrent_moves(tmp_path, "memory")
+    assert report["statuses"] == [200] * NUM_GAMES
+    assert max(int(size) for size in report["batch_sizes"]) > 1
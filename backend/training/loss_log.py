@@ -0,0 +1,82 @@
+# backend/training/loss_log.py
+#
+# Compact binary training log: one fixed-size record per window of episodes
+# instead of one CSV row per episode. Records are appended to a flat file
+# and read back with NumPy:
+#
+#   from loss_log import read_loss_log
+#   log = read_loss_log("logs/qlearning_training_log.bin")
+#   log["episode"], log["loss_mean"], ...
+
+import os
+
+import numpy as np
+
+LOG_DTYPE = np.dtype([
+    ("episode", "<u8"),     # last episode of the window
+    ("updates", "<u8"),     # total optimizer updates so far
+    ("epsilon", "<f4"),
+    ("loss_count", "<u4"),  # updates that happened in this window
+    ("loss_mean", "<f4"),
+    ("loss_min", "<f4"),
+    ("loss_max", "<f4"),
+    ("loss_std", "<f4"),
+])
+
+
+class LossLogWriter:
+    """Aggregates per-update losses and appends one record per `window` episodes."""
+
+    def __init__(self, path, window=1000, resume_episode=None):
+        """
+        resume_episode: when resuming from a checkpoint, records written after
+        that episode (by the crashed run) are dropped so the log lines up.
+        Without it, an existing log is overwritten.
+        """
+        self.path = path
+        self.window = window
+        self._losses = []
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        if resume_episode is not None and os.path.exists(path):
+            keep = int(np.searchsorted(read_loss_log(path)["episode"], resume_episode, side="right"))
+            os.truncate(path, keep * LOG_DTYPE.itemsize)
+            self._file = open(path, "ab")
+        else:
+            self._file = open(path, "wb")
+
+    def add_loss(self, loss):
+        self._losses.append(loss)
+
+    def end_episode(self, episode, updates, epsilon):
+        if episode % self.window == 0:
+            self._write(episode, updates, epsilon)
+
+    def _write(self, episode, updates, epsilon):
+        losses = np.array(self._losses, dtype=np.float32)
+        record = np.zeros(1, dtype=LOG_DTYPE)
+        record["episode"] = episode
+        record["updates"] = updates
+        record["epsilon"] = epsilon
+        record["loss_count"] = len(losses)
+        if len(losses):
+            record["loss_mean"] = losses.mean()
+            record["loss_min"] = losses.min()
+            record["loss_max"] = losses.max()
+            record["loss_std"] = losses.std()
+        else:
+            record[["loss_mean", "loss_min", "loss_max", "loss_std"]] = np.nan
+        self._file.write(record.tobytes())
+        self._losses.clear()
+
+    def flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def read_loss_log(path):
+    """Returns the log as a structured array with LOG_DTYPE fields."""
+    return np.fromfile(path, dtype=LOG_DTYPE)
@@ -0,0 +1,208 @@
+# backend/training/sweep.py
+#
+# Hyperparameter sweeps: each trial is a full train_qlearning run in its own
+# process, scored afterwards by exact evaluation (evaluation/exact_eval.py)
+# against perfect play and against the random player. Trials are ranked by
+# strength, then by CPU time.
+#
+#   python training/sweep.py --name lr --episodes 200000 \
+#       --param learning_rate=0.05,0.1,0.2 --param draw_reward=0.8,0.9 --workers 6
+#   python training/sweep.py --name rand --random 12 --param learning_rate=0.01:0.3:log ...
+#
+# --param KEY=a,b,c gives a list of values (grid or random choice);
+# KEY=lo:hi samples uniformly and KEY=lo:hi:log log-uniformly (random search only).
+
+import sys
+import os
+import csv
+import json
+import math
+import time
+import random
+import argparse
+import itertools
+import dataclasses
+import multiprocessing as mp
+
+# Adjust Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "evaluation")))
+
+import train_qlearning as tq
+from app.game import RESULT_X_WINS, RESULT_O_WINS, RESULT_DRAW
+from app.minimax import MINIMAX_TABLE_PATH, load_or_solve
+
+SWEEPS_DIR = os.path.join("models", "sweeps")
+RESULT_FIELDS = [
+    "rank", "trial", "strength", "loss_vs_perfect_as_x", "loss_vs_perfect_as_o",
+    "score_vs_random", "cpu_seconds", "model_path",
+]
+
+
+def parse_param(spec):
+    """'key=a,b' → (key, [a, b]); 'key=lo:hi[:log]' → (key, (lo, hi, log))."""
+    key, _, values = spec.partition("=")
+    fields = {field.name: field for field in dataclasses.fields(tq.TrainConfig)}
+    if key not in fields or not values:
+        raise argparse.ArgumentTypeError(f"Expected KEY=VALUES with KEY a TrainConfig field, got '{spec}'")
+    kind = tq.config_field_type(fields[key])
+    convert = tq.parse_bool if kind is bool else kind
+
+    if ":" in values:
+        lo, hi, *scale = values.split(":")
+        if kind not in (int, float):
+            raise argparse.ArgumentTypeError(f"Ranges need a numeric field, '{key}' is {kind.__name__}")
+        return key, (convert(lo), convert(hi), scale == ["log"])
+    return key, [convert(value) for value in values.split(",")]
+
+
+def sample_value(rng, values):
+    if isinstance(values, list):
+        return rng.choice(values)
+    lo, hi, log_scale = values
+    value = math.exp(rng.uniform(math.log(lo), math.log(hi))) if log_scale else rng.uniform(lo, hi)
+    return type(lo)(round(value)) if isinstance(lo, int) else value
+
+
+def make_trials(params, random_trials=None, seed=0):
+    """Returns a list of {field: value} overrides: the full grid, or `random_trials` samples."""
+    if random_trials is None:
+        ranges = [key for key, values in params.items() if not isinstance(values, list)]
+        if ranges:
+            raise ValueError(f"Ranges ({', '.join(ranges)}) need --random N")
+        keys = list(params)
+        return [dict(zip(keys, combo)) for combo in itertools.product(*(params[key] for key in keys))]
+
+    rng = random.Random(seed)
+    return [{key: sample_value(rng, values) for key, values in params.items()} for _ in range(random_trials)]
+
+
+def score_model(predict, minimax_table):
+    """Exact strength of the greedy policy of `predict` (see evaluation/exact_eval.py)."""
+    from exact_eval import evaluate_exact, deterministic_policy, optimal_policy, random_policy
+    from app.lookup import build_qtable
+
+    qtable = build_qtable(predict)
+    q_policy = deterministic_policy(lambda game: game.play_move(qtable.best_move(game.board)))
+    perfect = optimal_policy(minimax_table)
+
+    as_x, _ = evaluate_exact(q_policy, perfect)
+    as_o, _ = evaluate_exact(perfect, q_policy)
+    loss_as_x = float(as_x[RESULT_O_WINS])
+    loss_as_o = float(as_o[RESULT_X_WINS])
+
+    vs_random_x, _ = evaluate_exact(q_policy, random_policy)
+    vs_random_o, _ = evaluate_exact(random_policy, q_policy)
+    score_x = float(vs_random_x[RESULT_X_WINS] + vs_random_x[RESULT_DRAW] / 2)
+    score_o = float(vs_random_o[RESULT_O_WINS] + vs_random_o[RESULT_DRAW] / 2)
+
+    return {
+        # 1.0 = never loses to perfect play from either side
+        "strength": 1.0 - (loss_as_x + loss_as_o) / 2,
+        "loss_vs_perfect_as_x": loss_as_x,
+        "loss_vs_perfect_as_o": loss_as_o,
+        "score_vs_random": (score_x + score_o) / 2,
+    }
+
+
+def run_trial(task):
+    """Pool worker: trains one config (one CPU thread) and scores the result."""
+    import torch
+
+    index, config_values = task
+    torch.set_num_threads(1)
+    config = tq.TrainConfig(**config_values)
+
+    started = time.process_time()
+    trainer = tq.train(config, verbose=False)
+    cpu_seconds = time.process_time() - started
+
+    row = {"trial": index, "cpu_seconds": round(cpu_seconds, 1), "model_path": config.model_path}
+    row.update(score_model(trainer.predict_q_values, load_or_solve(MINIMAX_TABLE_PATH)))
+    return row
+
+
+def run_sweep(name, trials, base_config=None, workers=None):
+    """
+    Trains every trial (a dict of TrainConfig overrides) on a process pool.
+    Each trial writes to models/sweeps/<name>/trial_<i>/. Returns the ranked result rows.
+    """
+    base = (base_config or tq.TrainConfig()).to_dict()
+    sweep_dir = os.path.join(SWEEPS_DIR, name)
+    load_or_solve(MINIMAX_TABLE_PATH)  # solve once up front, not in every worker
+
+    tasks = []
+    for index, overrides in enumerate(trials):
+        trial_dir = os.path.join(sweep_dir, f"trial_{index:03d}")
+        values = dict(base, **overrides)
+        if "epsilon_decay_every" not in overrides and "episodes" in overrides:
+            values["epsilon_decay_every"] = None  # re-derive from the trial's episode count
+        values.update(
+            model_path=os.path.join(trial_dir, "model.pt"),
+            log_path=os.path.join(trial_dir, "training_log.bin"),
+            checkpoint_path=os.path.join(trial_dir, "checkpoint.pt"),
+        )
+        os.makedirs(trial_dir, exist_ok=True)
+        with open(os.path.join(trial_dir, "config.json"), "w") as f:
+            json.dump(dict(overrides=overrides, config=values), f, indent=2)
+        tasks.append((index, values))
+
+    rows = []
+    # spawn: each trial gets a fresh interpreter (and torch) instead of a fork of this one
+    with mp.get_context("spawn").Pool(workers, maxtasksperchild=1) as pool:
+        for row in pool.imap_unordered(run_trial, tasks):
+            row.update(trials[row["trial"]])
+            rows.append(row)
+            print(f"✅ Trial {row['trial']} done: strength {row['strength']:.4f}, "
+                  f"vs random {row['score_vs_random']:.4f}, {row['cpu_seconds']:.0f} CPU s")
+
+    rows.sort(key=lambda row: (-row["strength"], -row["score_vs_random"], row["cpu_seconds"]))
+    for rank, row in enumerate(rows, start=1):
+        row["rank"] = rank
+    return rows
+
+
+def save_sweep_results(rows, param_keys, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS + list(param_keys))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def print_ranking(rows, param_keys, top=10):
+    print(f"\n🏆 Top {min(top, len(rows))} of {len(rows)} trials:")
+    for row in rows[:top]:
+        params = ", ".join(f"{key}={row[key]:.4g}" if isinstance(row[key], float) else f"{key}={row[key]}"
+                           for key in param_keys)
+        print(f"{row['rank']:>3}. strength {row['strength']:.4f}  vs random {row['score_vs_random']:.4f}  "
+              f"{row['cpu_seconds']:>7.0f} CPU s  {params}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a parallel hyperparameter sweep of the Q-learning trainer.")
+    parser.add_argument("--name", required=True, help="sweep name (output directory and log file)")
+    parser.add_argument("--param", action="append", type=parse_param, default=[], metavar="KEY=VALUES",
+                        help="swept field: KEY=a,b,c or KEY=lo:hi[:log] (repeatable)")
+    parser.add_argument("--random", type=int, default=None, metavar="N", help="random search with N trials instead of the grid")
+    parser.add_argument("--sample-seed", type=int, default=0, help="seed for sampling random-search trials")
+    parser.add_argument("--workers", type=int, default=None, help="parallel trials (default: CPU count)")
+    tq.add_config_arguments(parser)  # base config shared by all trials
+    args = parser.parse_args()
+
+    params = dict(args.param)
+    if not params:
+        parser.error("at least one --param is required")
+    trials = make_trials(params, random_trials=args.random, seed=args.sample_seed)
+
+    print(f"🔬 Sweep '{args.name}': {len(trials)} trials on {args.workers or os.cpu_count()} workers...")
+    rows = run_sweep(args.name, trials, base_config=tq.config_from_args(args), workers=args.workers)
+
+    log_path = os.path.join("logs", f"sweep_{args.name}.csv")
+    save_sweep_results(rows, params, log_path)
+    print_ranking(rows, params)
+    print(f"\n📄 Results saved to: {log_path}")
+
+
+if __name__ == "__main__":
+    main()
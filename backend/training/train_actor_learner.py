@@ -0,0 +1,196 @@
+# backend/training/train_actor_learner.py
+#
+# Multi-process Q-learning: several actor processes play vectorized
+# self-play games with a NumPy copy of the policy and stream transitions
+# through a queue to this (learner) process, which owns the replay buffer,
+# the networks and the optimizer. The learner publishes its weights to
+# shared memory every PUBLISH_EVERY updates; actors pick them up between
+# chunks of episodes. Hyperparameters (TrainConfig, with the same --config
+# and --<field> options), checkpoints and the loss log are the ones of
+# train_qlearning.py.
+#
+#   python training/train_actor_learner.py --actors 8 [--resume] [--learning-rate 0.05 ...]
+
+import sys
+import os
+import queue
+import argparse
+import multiprocessing as mp
+
+# Adjust Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import torch
+
+import train_qlearning as tq
+from app.model import TicTacToeNet
+from app.numpy_model import NumpyTicTacToeNet
+from app.vec_game import VecTicTacToe
+from loss_log import LossLogWriter
+
+NUM_ACTORS = max(1, (os.cpu_count() or 2) - 1)  # one core is left to the learner
+ACTOR_ENVS = 64  # games stepped together by each actor
+CHUNK_EPISODES = 32  # episodes per queue message
+PUBLISH_EVERY = 20  # learner updates between weight publications
+QUEUE_CHUNKS_PER_ACTOR = 4  # bounded queue: actors wait when the learner falls behind
+QUEUE_POLL_SECONDS = 5.0  # learner waits this long for a chunk before checking the actors are alive
+
+
+def _read_weights(shared_net, weights_lock):
+    with weights_lock:
+        weights = {key: tensor.numpy().copy() for key, tensor in shared_net.state_dict().items()}
+    return NumpyTicTacToeNet(weights)
+
+
+def run_actor(actor_id, config, shared_net, weights_lock, weights_version, episode_counter,
+              transition_queue, stop_event):
+    """
+    Actor process: self-play with the latest published weights, sending
+    (num_episodes, boards, moves, rewards, next_boards, dones) chunks.
+    """
+    torch.set_num_threads(1)
+    env = VecTicTacToe(ACTOR_ENVS, seed=None if config.seed is None else config.seed + actor_id)
+    version = weights_version.value
+    net = _read_weights(shared_net, weights_lock)
+
+    chunk, num_episodes = [], 0
+
+    def current_epsilon():
+        return tq.epsilon_for_episode(config, episode_counter.value)
+
+    for episode in tq.self_play_episodes(config, env, lambda boards: net(boards), current_epsilon):
+        chunk.extend(tq.episode_transitions(config, *episode))
+        num_episodes += 1
+        if num_episodes < CHUNK_EPISODES:
+            continue
+
+        boards, moves, rewards, next_boards, dones = zip(*chunk)
+        message = (
+            num_episodes,
+            np.array(boards, dtype=np.float32),
+            np.array(moves, dtype=np.int64),
+            np.array(rewards, dtype=np.float32),
+            np.array(next_boards, dtype=np.float32),
+            np.array(dones, dtype=bool),
+        )
+        while not stop_event.is_set():
+            try:
+                transition_queue.put(message, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        if stop_event.is_set():
+            return
+        chunk, num_episodes = [], 0
+
+        if weights_version.value != version:
+            version = weights_version.value
+            net = _read_weights(shared_net, weights_lock)
+
+
+def _next_chunk(transition_queue, actors):
+    """Waits for the next actor message; raises RuntimeError once every actor has exited."""
+    while True:
+        try:
+            return transition_queue.get(timeout=QUEUE_POLL_SECONDS)
+        except queue.Empty:
+            if not any(actor.is_alive() for actor in actors):
+                exit_codes = ", ".join(f"{actor.name}: {actor.exitcode}" for actor in actors)
+                raise RuntimeError(f"All actors exited before training finished (exit codes {exit_codes})")
+
+
+def train_actor_learner(config=None, num_actors=NUM_ACTORS, resume=None):
+    """Learner process: see the module comment. Returns the trainer."""
+    config = config or tq.TrainConfig()
+    ctx = mp.get_context("spawn")  # actors must not inherit torch's thread pools
+
+    trainer = tq.QLearningTrainer(config)
+    train_state = trainer.train_state
+    start_episode = 0
+    if resume:
+        start_episode = trainer.load_checkpoint(resume)
+        print(f"⏯️ Resuming Q-learning training from episode {start_episode} ({resume})")
+    else:
+        print(f"🚀 Starting Q-learning training with {num_actors} actors...")
+    epsilon = tq.epsilon_for_episode(config, start_episode)
+
+    shared_net = TicTacToeNet()
+    shared_net.load_state_dict(trainer.policy_net.state_dict())
+    shared_net.share_memory()
+    weights_lock = ctx.Lock()
+    weights_version = ctx.Value("i", 0, lock=False)
+    episode_counter = ctx.Value("q", start_episode, lock=False)
+    transition_queue = ctx.Queue(maxsize=num_actors * QUEUE_CHUNKS_PER_ACTOR)
+    stop_event = ctx.Event()
+
+    def publish_weights():
+        with weights_lock:
+            shared_net.load_state_dict(trainer.policy_net.state_dict())
+        weights_version.value += 1
+
+    actors = [
+        ctx.Process(
+            target=run_actor, name=f"actor-{i}", daemon=True,
+            args=(i, config, shared_net, weights_lock, weights_version, episode_counter, transition_queue, stop_event),
+        )
+        for i in range(num_actors)
+    ]
+    for actor in actors:
+        actor.start()
+
+    loss_log = LossLogWriter(config.log_path, window=config.log_window,
+                             resume_episode=start_episode if resume else None)
+
+    episode = start_episode
+    try:
+        while episode < config.episodes:
+            num_episodes, *transitions = _next_chunk(transition_queue, actors)
+            trainer.replay_buffer.add_batch(*transitions)
+
+            # Same schedule as the single-process trainer: one update per update_every episodes
+            for _ in range(min(num_episodes, config.episodes - episode)):
+                episode += 1
+                if trainer.update_due():
+                    train_state["last_loss"] = trainer.optimize_step()
+                    loss_log.add_loss(train_state["last_loss"])
+                    if train_state["updates"] % PUBLISH_EVERY == 0:
+                        publish_weights()
+                loss_log.end_episode(episode, train_state["updates"], epsilon)
+
+                if episode % config.epsilon_decay_every == 0:
+                    epsilon = tq.epsilon_for_episode(config, episode)
+                    print(f"📉 Epsilon decayed to {epsilon:.2f} at episode {episode}")
+
+                if episode % config.checkpoint_every == 0:
+                    loss_log.flush()
+                    trainer.save_checkpoint(config.checkpoint_path, episode)
+
+                if episode % 10000 == 0 or episode == 1:
+                    print(f"✅ Completed {episode}/{config.episodes} episodes")
+            episode_counter.value = episode
+    finally:
+        stop_event.set()
+        for actor in actors:
+            actor.join(timeout=5)
+            if actor.is_alive():
+                actor.terminate()
+        loss_log.close()
+
+    trainer.save_model()
+    print("\n✅ Q-learning training complete.")
+    print(f"💾 Model saved to: {config.model_path}")
+    print(f"📄 Log saved to: {config.log_path}")
+    return trainer
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the Q-learning model with parallel actors.")
+    parser.add_argument("--actors", type=int, default=NUM_ACTORS, help=f"self-play processes (default {NUM_ACTORS})")
+    tq.add_config_arguments(parser)
+    parser.add_argument("--resume", nargs="?", const="", default=None,
+                        help="continue from a checkpoint (default: the config's checkpoint_path)")
+    args = parser.parse_args()
+    config = tq.config_from_args(args)
+    resume = (args.resume or config.checkpoint_path) if args.resume is not None else None
+    train_actor_learner(config, args.actors, resume=resume)
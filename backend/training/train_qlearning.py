@@ -1,8 +1,29 @@
 # backend/training/train_qlearning.py
+#
+# Every hyperparameter lives in TrainConfig; the defaults below are the
+# recommended settings for this trainer. Override them from a JSON file
+# and/or the command line:
+#
+#   python training/train_qlearning.py --config my_run.json --learning-rate 0.05 --episodes 500000
+#
+# The shipped model predates the replay buffer: it used the same episode count,
+# epsilon schedule, learning rate and rewards, but one SGD step per learner
+# transition of each finished game (last move first), with the target
+# network synced after every game. The nearest run with this trainer updates
+# after every game from a buffer of about one game's transitions, and syncs
+# after every update:
+#
+#   python training/train_qlearning.py --num-envs 1 --replay-capacity 5 --batch-size 5 \
+#       --min-replay-size 1 --update-every 1 --target-sync-every 1
 
 import sys
 import os
-import csv
+import json
+import typing
+import argparse
+import dataclasses
+from dataclasses import dataclass
+from typing import Optional
 
 # Adjust Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -11,11 +32,17 @@ import torch
 import torch.nn as nn
 import torch.optim as optim
 import random
+import numpy as np
 from collections import deque
 from app.model import TicTacToeNet
 from app.game import TicTacToe
+from app.vec_game import VecTicTacToe
+from app.replay_buffer import ReplayBuffer
+from app.symmetry import augment
+from app.utils import best_moves, sample_moves
+from loss_log import LossLogWriter
 
-# Hyperparameters
+# Default hyperparameters
 EPISODES = 1500000
 DISCOUNT_FACTOR = 1.0
 EPSILON_START = 0.6
@@ -26,41 +53,106 @@ WIN_REWARD = 1.0
 DRAW_REWARD = 0.9
 LOSS_REWARD = 0.0
 SIDE_MOVE_PENALTY = 0.95  # multiplier penalty if X starts with side move
-
-# Output paths
+NUM_ENVS = 128  # games stepped together by the vectorized self-play loop
+REPLAY_CAPACITY = 50000
+BATCH_SIZE = 64
+MIN_REPLAY_SIZE = 1000  # no updates until the buffer holds this many transitions
+UPDATE_EVERY = 2  # one mini-batch update per this many finished episodes
+TARGET_SYNC_EVERY = 500  # copy policy → target every this many updates
+AUGMENT_SYMMETRIES = False  # train each sampled batch on all 8 board symmetries
+
+# Default output paths
 MODEL_PATH = os.path.join("models", "tictactoe_model_qlearning.pt")
-LOG_PATH = os.path.join("logs", "qlearning_training_log.csv")
+LOG_PATH = os.path.join("logs", "qlearning_training_log.bin")  # see training/loss_log.py
+CHECKPOINT_PATH = os.path.join("models", "checkpoints", "qlearning_checkpoint.pt")
+CHECKPOINT_EVERY = 50000  # episodes between checkpoints
+LOG_WINDOW = 1000  # episodes aggregated per loss log record
 
 # Device
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
-# Initialize networks
-policy_net = TicTacToeNet().to(device)
-target_net = TicTacToeNet().to(device)
-target_net.load_state_dict(policy_net.state_dict())
-target_net.eval()
-
-optimizer = optim.SGD(policy_net.parameters(), lr=LEARNING_RATE)
-loss_fn = nn.MSELoss()
-
-def board_to_tensor(board):
-    return torch.tensor(board, dtype=torch.float32).to(device)
-
-def get_q_values(board, model):
-    return model(board_to_tensor(board))
+EMPTY_BOARD = [0] * 9
+
+
+@dataclass
+class TrainConfig:
+    episodes: int = EPISODES
+    discount_factor: float = DISCOUNT_FACTOR
+    epsilon_start: float = EPSILON_START
+    epsilon_decay: float = EPSILON_DECAY
+    epsilon_decay_every: Optional[int] = None  # None → episodes // 10
+    learning_rate: float = LEARNING_RATE
+    win_reward: float = WIN_REWARD
+    draw_reward: float = DRAW_REWARD
+    loss_reward: float = LOSS_REWARD
+    side_move_penalty: float = SIDE_MOVE_PENALTY
+    num_envs: int = NUM_ENVS
+    replay_capacity: int = REPLAY_CAPACITY
+    batch_size: int = BATCH_SIZE
+    min_replay_size: int = MIN_REPLAY_SIZE
+    update_every: int = UPDATE_EVERY
+    target_sync_every: int = TARGET_SYNC_EVERY
+    augment_symmetries: bool = AUGMENT_SYMMETRIES
+    seed: Optional[int] = None  # seeds torch, random, the env and the replay buffer
+    model_path: str = MODEL_PATH
+    log_path: str = LOG_PATH
+    checkpoint_path: str = CHECKPOINT_PATH
+    checkpoint_every: int = CHECKPOINT_EVERY
+    log_window: int = LOG_WINDOW
+
+    def __post_init__(self):
+        if self.epsilon_decay_every is None:
+            self.epsilon_decay_every = max(1, self.episodes // 10)
+
+    @classmethod
+    def from_file(cls, path, **overrides):
+        """Reads a JSON object of field values; unknown keys are an error."""
+        with open(path) as f:
+            values = json.load(f)
+        unknown = set(values) - {field.name for field in dataclasses.fields(cls)}
+        if unknown:
+            raise ValueError(f"Unknown config keys in {path}: {sorted(unknown)}")
+        values.update(overrides)
+        return cls(**values)
+
+    def to_dict(self):
+        return dataclasses.asdict(self)
+
+
+def config_field_type(field):
+    """int for Optional[int], etc."""
+    args = [arg for arg in typing.get_args(field.type) if arg is not type(None)]
+    return args[0] if args else field.type
+
+def parse_bool(value):
+    return str(value).lower() in ("1", "true", "yes")
+
+def add_config_arguments(parser):
+    """Adds --config plus one --<field-name> option per TrainConfig field."""
+    parser.add_argument("--config", default=None, help="JSON file with TrainConfig values")
+    for field in dataclasses.fields(TrainConfig):
+        kind = config_field_type(field)
+        parser.add_argument("--" + field.name.replace("_", "-"), dest=field.name, default=None,
+                            type=parse_bool if kind is bool else kind)
+
+def config_from_args(args):
+    """Builds the TrainConfig: defaults ← --config file ← command-line options."""
+    overrides = {field.name: getattr(args, field.name) for field in dataclasses.fields(TrainConfig)
+                 if getattr(args, field.name) is not None}
+    if args.config:
+        return TrainConfig.from_file(args.config, **overrides)
+    return TrainConfig(**overrides)
 
 def get_valid_moves(board):
     return [i for i, val in enumerate(board) if val == 0]
 
-def choose_move(board, model, epsilon):
-    if random.random() < epsilon:
-        return random.choice(get_valid_moves(board))
-    with torch.no_grad():
-        q_values = get_q_values(board, model)
-        valid_moves = get_valid_moves(board)
-        q_values_np = q_values.cpu().numpy()
-        valid_qs = [(i, q_values_np[i]) for i in valid_moves]
-        return max(valid_qs, key=lambda x: x[1])[0]
+def choose_moves(boards, predict, epsilon, rng):
+    """
+    Batched epsilon-greedy: one (N, 9) forward pass, illegal cells masked out.
+    boards: int8[N, 9] NumPy array → int64[N] moves
+    predict: float32[N, 9] → Q-values [N, 9] (a trainer's predict_q_values, or an actor's NumPy copy)
+    """
+    return sample_moves(predict(boards.astype(np.float32)), boards, rng, epsilon=epsilon)
 
 def is_win(board, player):
     wins = [(0,1,2), (3,4,5), (6,7,8),
@@ -74,101 +166,333 @@ def is_win(board, player):
 def is_draw(board):
     return all(cell != 0 for cell in board)
 
-def get_game_result(board, learner_player):
+def get_game_result(config, board, learner_player):
     if is_win(board, learner_player):
-        return WIN_REWARD
+        return config.win_reward
     elif is_win(board, -learner_player):
-        return LOSS_REWARD
+        return config.loss_reward
     elif is_draw(board):
-        return DRAW_REWARD
+        return config.draw_reward
     return None
 
-def backpropagate(position, move_index, target_value):
-    policy_net.train()
-    optimizer.zero_grad()
-
-    output = policy_net(board_to_tensor(position))
-    target = output.clone().detach()
-    target[move_index] = target_value
-
-    for i in range(9):
-        if position[i] != 0:
-            target[i] = LOSS_REWARD
-
-    loss = loss_fn(output, target)
-    loss.backward()
-    optimizer.step()
-    return loss.item()
-
-def play_training_episode(epsilon):
-    game = TicTacToe()
-    history = deque()
-    losses = []
-
-    learner_player = -1 if random.random() < 0.7 else 1
-    first_move_index = None
-
-    while not game.is_full() and game.check_winner() is None:
-        board = game.board.copy()
-        if game.current_player == learner_player:
-            move = choose_move(board, policy_net, epsilon)
-            if learner_player == 1 and len(history) == 0:
-                first_move_index = move
-            history.appendleft((board, move))
-        else:
-            move = random.choice(get_valid_moves(board))
-        game.make_move(move)
-        game.switch_player()
-
-    result = get_game_result(game.board, learner_player)
+def reward_for_result(config, result, learner_player):
+    """Maps a RESULT_* code of a finished game to the learner's reward."""
+    if result == learner_player:
+        return config.win_reward
+    elif result == -learner_player:
+        return config.loss_reward
+    return config.draw_reward
+
+def epsilon_for_episode(config, episode):
+    """Epsilon in effect after `episode` completed episodes."""
+    return max(0.0, config.epsilon_start - config.epsilon_decay * (episode // config.epsilon_decay_every))
+
+def episode_transitions(config, history, result, learner_player, first_move_index):
+    """
+    history: learner's (board, move) pairs, most recent first.
+    Yields the episode's (board, move, reward, next_board, done) transitions.
+    """
     if result is None or not history:
-        return 0.0
+        return
 
     # Apply side penalty if X started with a side move
     if learner_player == 1 and first_move_index in [1, 3, 5, 7]:
-        result *= SIDE_MOVE_PENALTY
-
-    next_board, last_move = history[0]
-    loss = backpropagate(next_board, last_move, result)
-    losses.append(loss)
-
-    for (board, move) in list(history)[1:]:
-        with torch.no_grad():
-            next_qs = get_q_values(next_board, target_net)
-            max_q = torch.max(next_qs).item()
-        loss = backpropagate(board, move, DISCOUNT_FACTOR * max_q)
-        losses.append(loss)
+        result *= config.side_move_penalty
+
+    # Last learner move gets the game result; earlier moves bootstrap from
+    # the learner's next board through the target network.
+    next_board = EMPTY_BOARD
+    reward, done = result, True
+    for (board, move) in history:
+        yield board, move, reward, next_board, done
         next_board = board
+        reward, done = 0.0, False
+
+def self_play_episodes(config, env, predict, current_epsilon):
+    """
+    Self-play over a VecTicTacToe batch against the random opponent. Learner
+    moves for all games are picked with one batched forward pass per step.
+    Yields (history, reward, learner_player, first_move_index) per finished
+    game; current_epsilon() is read before every step.
+    """
+    num_envs = env.num_envs
+    rng = env.rng
+
+    def new_learners(n):
+        return np.where(rng.random(n) < 0.7, -1, 1).astype(np.int8)
+
+    learners = new_learners(num_envs)
+    histories = [deque() for _ in range(num_envs)]
+    first_moves = [None] * num_envs
+
+    while True:
+        learner_turn = env.current_player == learners
+        moves = env.random_moves()
+        if learner_turn.any():
+            moves[learner_turn] = choose_moves(env.boards[learner_turn], predict, current_epsilon(), rng)
+            for i in np.flatnonzero(learner_turn):
+                if learners[i] == 1 and not histories[i]:
+                    first_moves[i] = int(moves[i])
+                histories[i].appendleft((env.boards[i].tolist(), int(moves[i])))
+
+        done, results, _ = env.step(moves)
+        for i in np.flatnonzero(done):
+            result = reward_for_result(config, int(results[i]), int(learners[i]))
+            yield histories[i], result, int(learners[i]), first_moves[i]
+            histories[i] = deque()
+            first_moves[i] = None
+        if done.any():
+            learners[done] = new_learners(int(done.sum()))
+
+
+class QLearningTrainer:
+    """
+    Networks, optimizer, replay buffer and schedule counters for one training
+    run, built from a TrainConfig (nothing is created at import time).
+    """
+
+    def __init__(self, config: TrainConfig):
+        self.config = config
+        if config.seed is not None:
+            random.seed(config.seed)
+            torch.manual_seed(config.seed)
+
+        self.policy_net = TicTacToeNet().to(device)
+        self.target_net = TicTacToeNet().to(device)
+        self.target_net.load_state_dict(self.policy_net.state_dict())
+        self.target_net.eval()
+
+        self.optimizer = optim.SGD(self.policy_net.parameters(), lr=config.learning_rate)
+        self.loss_fn = nn.MSELoss()
+
+        self.replay_buffer = ReplayBuffer(config.replay_capacity, seed=config.seed)
+
+        # Counters driving the update / target-sync schedule
+        self.train_state = {"episodes": 0, "updates": 0, "last_loss": 0.0}
+
+    def predict_q_values(self, boards):
+        """Policy network on a float32 NumPy batch [N, 9] → NumPy Q-values [N, 9]."""
+        with torch.no_grad():
+            return self.policy_net(torch.from_numpy(boards).to(device)).cpu().numpy()
+
+    def choose_move(self, board, epsilon):
+        if random.random() < epsilon:
+            return random.choice(get_valid_moves(board))
+        return best_moves(self.predict_q_values(np.array([board], dtype=np.float32))[0], board)
+
+    def backpropagate(self, boards, move_indexes, target_values):
+        """
+        One SGD step on a mini-batch.
+        boards: float[B, 9], move_indexes: long[B], target_values: float[B] (tensors)
+        """
+        self.policy_net.train()
+        self.optimizer.zero_grad()
+
+        output = self.policy_net(boards)
+        target = output.clone().detach()
+        target[torch.arange(len(move_indexes), device=device), move_indexes] = target_values
+
+        # Occupied cells are never legal moves
+        target[boards != 0] = self.config.loss_reward
+
+        loss = self.loss_fn(output, target)
+        loss.backward()
+        self.optimizer.step()
+        return loss.item()
+
+    def optimize_step(self):
+        """Samples a mini-batch from the replay buffer and applies one update."""
+        config = self.config
+        boards, moves, rewards, next_boards, dones = self.replay_buffer.sample(config.batch_size)
+        rewards = torch.from_numpy(rewards).to(device)
+        next_boards = torch.from_numpy(next_boards).to(device)
+        dones = torch.from_numpy(dones).to(device)
 
-    target_net.load_state_dict(policy_net.state_dict())
-    return sum(losses) / len(losses) if losses else 0.0
-
-def train():
-    print("🚀 Starting Q-learning training...")
-    epsilon = EPSILON_START
-
-    os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
-    os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
-
-    with open(LOG_PATH, mode="w", newline="") as file:
-        writer = csv.writer(file)
-        writer.writerow(["episode", "loss"])
-
-        for episode in range(1, EPISODES + 1):
-            loss = play_training_episode(epsilon)
-            writer.writerow([episode, loss])
-
-            if episode % EPSILON_DECAY_EVERY == 0:
-                epsilon = max(0.0, epsilon - EPSILON_DECAY)
-                print(f"📉 Epsilon decayed to {epsilon:.2f} at episode {episode}")
-
-            if episode % 10000 == 0 or episode == 1:
-                print(f"✅ Completed {episode}/{EPISODES} episodes")
-
-    torch.save(policy_net.state_dict(), MODEL_PATH)
-    print("\n✅ Q-learning training complete.")
-    print(f"💾 Model saved to: {MODEL_PATH}")
-    print(f"📄 Log saved to: {LOG_PATH}")
+        with torch.no_grad():
+            max_next_q = self.target_net(next_boards).max(dim=1).values
+        targets = torch.where(dones, rewards, config.discount_factor * max_next_q)
+
+        # A move's value does not change under rotation/reflection, so the same
+        # targets apply to all 8 symmetric (board, move) pairs
+        if config.augment_symmetries:
+            boards, moves = augment(boards, moves)
+            targets = targets.repeat(8)
+
+        boards = torch.from_numpy(np.ascontiguousarray(boards)).to(device)
+        moves = torch.from_numpy(np.ascontiguousarray(moves)).to(device)
+
+        loss = self.backpropagate(boards, moves, targets)
+
+        self.train_state["updates"] += 1
+        if self.train_state["updates"] % config.target_sync_every == 0:
+            self.target_net.load_state_dict(self.policy_net.state_dict())
+        return loss
+
+    def update_due(self):
+        """Counts one finished episode; True when the schedule calls for an update."""
+        self.train_state["episodes"] += 1
+        return (len(self.replay_buffer) >= self.config.min_replay_size
+                and self.train_state["episodes"] % self.config.update_every == 0)
+
+    def learn_from_episode(self, history, result, learner_player, first_move_index):
+        """
+        Stores the episode's transitions and runs the scheduled mini-batch update.
+        Returns the most recent update loss.
+        """
+        if result is None or not history:
+            return self.train_state["last_loss"]
+
+        for transition in episode_transitions(self.config, history, result, learner_player, first_move_index):
+            self.replay_buffer.add(*transition)
+
+        if self.update_due():
+            self.train_state["last_loss"] = self.optimize_step()
+        return self.train_state["last_loss"]
+
+    def play_training_episode(self, epsilon):
+        game = TicTacToe()
+        history = deque()
+
+        learner_player = -1 if random.random() < 0.7 else 1
+        first_move_index = None
+
+        while not game.is_full() and game.check_winner() is None:
+            board = game.board.copy()
+            if game.current_player == learner_player:
+                move = self.choose_move(board, epsilon)
+                if learner_player == 1 and len(history) == 0:
+                    first_move_index = move
+                history.appendleft((board, move))
+            else:
+                move = random.choice(get_valid_moves(board))
+            game.make_move(move)
+            game.switch_player()
+
+        result = get_game_result(self.config, game.board, learner_player)
+        return self.learn_from_episode(history, result, learner_player, first_move_index)
+
+    def play_vectorized_episodes(self, env=None, start_episode=0):
+        """
+        Vectorized self-play with the policy network; each finished game is
+        learned from exactly like play_training_episode. Yields one average loss
+        per episode. Pass `env` (and the episodes already completed) to continue
+        a resumed run.
+        """
+        env = env or VecTicTacToe(self.config.num_envs, seed=self.config.seed)
+        completed = start_episode
+
+        def current_epsilon():
+            return epsilon_for_episode(self.config, completed)
+
+        for episode in self_play_episodes(self.config, env, self.predict_q_values, current_epsilon):
+            yield self.learn_from_episode(*episode)
+            completed += 1
+
+    def save_checkpoint(self, path, episode, env=None):
+        """
+        Writes everything needed to continue training after `episode`: config,
+        networks, optimizer, schedule counters, replay buffer and RNG states.
+        Atomic: a crash mid-write leaves the previous checkpoint intact. Games
+        in flight in the vectorized env are not saved; a resumed run starts
+        them afresh. env is None for the actor/learner trainer, whose envs
+        live in the actors.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        checkpoint = {
+            "episode": episode,
+            "epsilon": epsilon_for_episode(self.config, episode),
+            "config": self.config.to_dict(),
+            "policy_net": self.policy_net.state_dict(),
+            "target_net": self.target_net.state_dict(),
+            "optimizer": self.optimizer.state_dict(),
+            "train_state": dict(self.train_state),
+            "replay_buffer": self.replay_buffer.state_dict(),
+            "env_rng_state": env.rng.bit_generator.state if env is not None else None,
+            "python_rng_state": random.getstate(),
+            "torch_rng_state": torch.get_rng_state(),
+        }
+        tmp_path = path + ".tmp"
+        torch.save(checkpoint, tmp_path)
+        os.replace(tmp_path, path)
+
+    def load_checkpoint(self, path, env=None):
+        """Restores a checkpoint written by save_checkpoint; returns its episode."""
+        # Our own file, holding NumPy arrays and RNG states as well as tensors
+        checkpoint = torch.load(path, map_location=device, weights_only=False)
+        self.policy_net.load_state_dict(checkpoint["policy_net"])
+        self.target_net.load_state_dict(checkpoint["target_net"])
+        self.optimizer.load_state_dict(checkpoint["optimizer"])
+        self.train_state.update(checkpoint["train_state"])
+        self.replay_buffer.load_state_dict(checkpoint["replay_buffer"])
+        if env is not None and checkpoint["env_rng_state"] is not None:
+            env.rng.bit_generator.state = checkpoint["env_rng_state"]
+        random.setstate(checkpoint["python_rng_state"])
+        torch.set_rng_state(checkpoint["torch_rng_state"])
+        return checkpoint["episode"]
+
+    def save_model(self):
+        """Writes the policy network's weights to config.model_path (atomically)."""
+        path = self.config.model_path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        torch.save(self.policy_net.state_dict(), tmp_path)
+        os.replace(tmp_path, path)
+
+
+def train(config: TrainConfig = None, resume=None, verbose=True):
+    """
+    Runs one training run and saves the model to config.model_path.
+    resume: checkpoint path to continue from, or None to start fresh.
+    Returns the trainer.
+    """
+    config = config or TrainConfig()
+    say = print if verbose else (lambda *args, **kwargs: None)
+    trainer = QLearningTrainer(config)
+    env = VecTicTacToe(config.num_envs, seed=config.seed)
+    start_episode = 0
+    if resume:
+        start_episode = trainer.load_checkpoint(resume, env)
+        say(f"⏯️ Resuming Q-learning training from episode {start_episode} ({resume})")
+    else:
+        say("🚀 Starting Q-learning training...")
+    epsilon = epsilon_for_episode(config, start_episode)
+
+    loss_log = LossLogWriter(config.log_path, window=config.log_window,
+                             resume_episode=start_episode if resume else None)
+
+    train_state = trainer.train_state
+    episodes = trainer.play_vectorized_episodes(env=env, start_episode=start_episode)
+    for episode in range(start_episode + 1, config.episodes + 1):
+        updates = train_state["updates"]
+        loss = next(episodes)
+        if train_state["updates"] != updates:
+            loss_log.add_loss(loss)
+        loss_log.end_episode(episode, train_state["updates"], epsilon)
+
+        if episode % config.epsilon_decay_every == 0:
+            epsilon = epsilon_for_episode(config, episode)
+            say(f"📉 Epsilon decayed to {epsilon:.2f} at episode {episode}")
+
+        if episode % config.checkpoint_every == 0:
+            loss_log.flush()
+            trainer.save_checkpoint(config.checkpoint_path, episode, env)
+
+        if episode % 10000 == 0 or episode == 1:
+            say(f"✅ Completed {episode}/{config.episodes} episodes")
+
+    loss_log.close()
+    trainer.save_model()
+    say("\n✅ Q-learning training complete.")
+    say(f"💾 Model saved to: {config.model_path}")
+    say(f"📄 Log saved to: {config.log_path}")
+    return trainer
 
 if __name__ == "__main__":
-    train()
+    parser = argparse.ArgumentParser(description="Train the Q-learning model.")
+    add_config_arguments(parser)
+    parser.add_argument("--resume", nargs="?", const="", default=None,
+                        help="continue from a checkpoint (default: the config's checkpoint_path)")
+    args = parser.parse_args()
+    config = config_from_args(args)
+    resume = (args.resume or config.checkpoint_path) if args.resume is not None else None
+    train(config, resume=resume)
@@ -0,0 +1,225 @@
+# backend/training/train_tabular.py
+#
+# Tabular alternative to train_qlearning.py. TicTacToe has only 4,520
+# unfinished boards, so the Q-function fits in a dense float32[3**9, 9]
+# array indexed by the base-3 board encoding (app/lookup.py). Value
+# iteration updates every board at once with NumPy until the table is
+# exact (a few sweeps), then the table is distilled into TicTacToeNet by
+# batched supervised regression and saved where the API loads the model:
+#
+#   python training/train_tabular.py
+#   python training/train_tabular.py --opponent random --model-path models/candidate.pt
+#
+# Q-values are rewards for the side to move: Q(s, a) is the reward if a ends
+# the game, else the reward if the opponent's reply ends it, else discount *
+# max Q of the board after the reply. The reply is the worst one for the
+# mover (--opponent minimax: perfect play) or the average over all replies
+# (--opponent random: train_qlearning.py's sparring partner).
+
+import os
+import sys
+import time
+import argparse
+
+# Adjust Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import torch
+import torch.optim as optim
+
+from app.model import TicTacToeNet
+from app.lookup import NUM_ENCODINGS
+from app.vec_game import LINES
+from app.paths import MODELS_DIR
+
+# Default hyperparameters
+OPPONENTS = ("minimax", "random")
+DISCOUNT_FACTOR = 0.99  # quicker wins rank higher
+WIN_REWARD = 1.0
+DRAW_REWARD = 0.5  # train_qlearning.py uses 0.9: same ranking, but a wider win/draw margin is easier to distill
+LOSS_REWARD = 0.0
+MAX_SWEEPS = 20  # value iteration is exact after at most 5 (one per move pair)
+DISTILL_EPOCHS = 1000  # upper bound: distillation stops once every board gets a best move
+DISTILL_LEARNING_RATE = 0.01
+DISTILL_BATCH_SIZE = 128
+CHECK_EVERY = 25  # epochs between checks of the distilled policy
+HARD_BOARD_BOOST = 2.0  # loss weight multiplier, per check, for boards still given a wrong move
+SEED = 0
+
+MODEL_PATH = os.path.join(MODELS_DIR, "tictactoe_model_qlearning.pt")
+POWERS = 3 ** np.arange(9)
+
+
+def all_boards():
+    """int8[3**9, 9]: the board of every encoding (digit 1 = X, 2 = O)."""
+    digits = (np.arange(NUM_ENCODINGS)[:, None] // POWERS) % 3
+    return np.where(digits == 2, -1, digits).astype(np.int8)
+
+
+def solve_q_table(opponent="minimax", discount_factor=DISCOUNT_FACTOR, win_reward=WIN_REWARD,
+                  draw_reward=DRAW_REWARD, loss_reward=LOSS_REWARD, max_sweeps=MAX_SWEEPS):
+    """
+    Vectorized value iteration over every unfinished board.
+    Returns (q float32[3**9, 9], states int64[S], sweeps): Q-values for the
+    side to move, on the unfinished boards `states` (loss_reward on occupied
+    cells and on every other board).
+    """
+    if opponent not in OPPONENTS:
+        raise ValueError(f"Unknown opponent '{opponent}', expected one of {OPPONENTS}")
+    boards = all_boards()
+    x_count = (boards == 1).sum(axis=1)
+    o_count = (boards == -1).sum(axis=1)
+    line_sums = boards[:, LINES].sum(axis=2)
+    winner = np.select([(line_sums == 3).any(axis=1), (line_sums == -3).any(axis=1)], [1, -1], 0)
+    finished = (winner != 0) | (x_count + o_count == 9)
+
+    # Every board with legal counts and no line is reachable: no earlier position had a line either
+    states = np.flatnonzero(((x_count == o_count) | (x_count == o_count + 1)) & ~finished)
+    mover = np.where(x_count[states] == o_count[states], 1, -1)
+
+    def step(codes, players):
+        """Moves of `players` from `codes` (shape [...]) → (legal [..., 9], next codes [..., 9], 0 where illegal)."""
+        legal = boards[codes] == 0
+        digits = np.where(players == 1, 1, 2)[..., None]
+        return legal, np.where(legal, codes[..., None] + digits * POWERS, 0)
+
+    def rewards(codes, players):
+        """Reward for `players` of the finished boards among `codes` (callers mask out the rest)."""
+        return np.select([winner[codes] == players, winner[codes] == -players], [win_reward, loss_reward], draw_reward)
+
+    # The mover's move a [S, 9], then the opponent's reply b [S, 9, 9]
+    legal_a, after_a = step(states, mover)
+    done_a = legal_a & finished[after_a]
+    reward_a = rewards(after_a, mover[:, None])
+    replying = legal_a & ~done_a
+    legal_b, after_b = step(np.where(replying, after_a, states[:, None]), -mover[:, None])
+    legal_b &= replying[..., None]
+    done_b = legal_b & finished[after_b]
+    reward_b = rewards(after_b, mover[:, None, None])
+
+    q = np.full((NUM_ENCODINGS, 9), loss_reward, dtype=np.float32)
+    values = np.zeros(NUM_ENCODINGS, dtype=np.float32)  # max legal Q per board
+    for sweep in range(1, max_sweeps + 1):
+        following = np.where(done_b, reward_b, discount_factor * values[after_b])
+        if opponent == "minimax":
+            replies = np.where(legal_b, following, np.inf).min(axis=2)
+        else:
+            replies = np.where(legal_b, following, 0.0).sum(axis=2) / np.maximum(legal_b.sum(axis=2), 1)
+        new_q = np.where(done_a, reward_a, np.where(replying, replies, loss_reward)).astype(np.float32)
+
+        changed = not np.array_equal(new_q, q[states])
+        q[states] = new_q
+        values[states] = np.where(legal_a, new_q, -np.inf).max(axis=1)
+        if not changed:
+            break
+    return q, states, sweep
+
+
+def best_move_mask(q_values, boards, tolerance=1e-6):
+    """bool[B, 9]: the legal moves whose Q-value is within tolerance of the best one."""
+    masked = np.where(boards == 0, q_values, -np.inf)
+    return masked >= masked.max(axis=1, keepdims=True) - tolerance
+
+
+def distill(targets, boards, best_moves, epochs=DISTILL_EPOCHS, learning_rate=DISTILL_LEARNING_RATE,
+            batch_size=DISTILL_BATCH_SIZE, seed=SEED, verbose=True):
+    """
+    Fits TicTacToeNet to the Q-vectors `targets` [B, 9] of `boards` [B, 9]
+    by mini-batch regression (Adam, cosine learning-rate decay). Occupied
+    cells are masked at inference, so they are left out of the loss. Every
+    CHECK_EVERY epochs the greedy move is checked against best_moves (bool
+    [B, 9]); boards still answered wrongly weigh HARD_BOARD_BOOST times more
+    from then on. Stops once every board gets a best move.
+    Returns (model with the best check, share of boards it answers with a best move).
+    """
+    from app.utils import best_moves as greedy_moves
+
+    say = print if verbose else (lambda *args, **kwargs: None)
+    torch.manual_seed(seed)
+    inputs = torch.from_numpy(boards.astype(np.float32))
+    targets = torch.from_numpy(np.asarray(targets, dtype=np.float32))
+    legal = inputs == 0
+    weights = torch.ones(len(boards), 1)
+    rows = np.arange(len(boards))
+
+    model = TicTacToeNet()
+    optimizer = optim.Adam(model.parameters(), lr=learning_rate)
+    scheduler = optim.lr_scheduler.CosineAnnealingLR(optimizer, epochs)
+    best_share, best_state = -1.0, None
+    for epoch in range(1, epochs + 1):
+        model.train()
+        for batch in torch.randperm(len(boards)).split(batch_size):
+            optimizer.zero_grad()
+            errors = (model(inputs[batch]) - targets[batch]) ** 2
+            loss = (weights[batch] * errors)[legal[batch]].mean()
+            loss.backward()
+            optimizer.step()
+        scheduler.step()
+
+        if epoch % CHECK_EVERY and epoch != epochs:
+            continue
+        model.eval()
+        with torch.no_grad():
+            predicted = model(inputs).numpy()
+        correct = best_moves[rows, greedy_moves(predicted, boards)]
+        share = float(correct.mean())
+        if share > best_share:
+            best_share, best_state = share, {k: v.clone() for k, v in model.state_dict().items()}
+        if epoch % (4 * CHECK_EVERY) == 0 or share == 1.0:
+            say(f"🧪 Epoch {epoch}: loss {loss.item():.2e}, best move on {share:.2%} of boards")
+        if share == 1.0:
+            break
+        weights[torch.from_numpy(~correct)] *= HARD_BOARD_BOOST
+
+    model.load_state_dict(best_state)
+    model.eval()
+    return model, best_share
+
+
+def save_model(model, path):
+    """Writes the weights to `path` atomically (like QLearningTrainer.save_model) plus the NumPy export."""
+    from app.numpy_model import export_weights
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    torch.save(model.state_dict(), tmp_path)
+    os.replace(tmp_path, path)
+    # Torch-free serving reads the .npz, and cannot re-export it
+    return export_weights(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train TicTacToeNet from an exact tabular Q-function.")
+    parser.add_argument("--opponent", choices=OPPONENTS, default="minimax",
+                        help="replies assumed by the table: perfect play (default) or uniform random")
+    parser.add_argument("--discount-factor", type=float, default=DISCOUNT_FACTOR)
+    parser.add_argument("--win-reward", type=float, default=WIN_REWARD)
+    parser.add_argument("--draw-reward", type=float, default=DRAW_REWARD)
+    parser.add_argument("--loss-reward", type=float, default=LOSS_REWARD)
+    parser.add_argument("--epochs", type=int, default=DISTILL_EPOCHS, help="maximum distillation epochs")
+    parser.add_argument("--learning-rate", type=float, default=DISTILL_LEARNING_RATE)
+    parser.add_argument("--batch-size", type=int, default=DISTILL_BATCH_SIZE)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    rewards = dict(win_reward=args.win_reward, draw_reward=args.draw_reward, loss_reward=args.loss_reward)
+    q, states, sweeps = solve_q_table(args.opponent, args.discount_factor, **rewards)
+    print(f"📐 Value iteration ({args.opponent} opponent): {len(states)} boards, {sweeps} sweeps, "
+          f"{time.perf_counter() - started:.2f}s")
+
+    # A best move is one that keeps the undiscounted value: any win, not only the quickest
+    boards = all_boards()[states]
+    game_values, _, _ = solve_q_table(args.opponent, discount_factor=1.0, **rewards)
+    best_moves = best_move_mask(game_values[states], boards)
+
+    model, share = distill(q[states], boards, best_moves, args.epochs, args.learning_rate, args.batch_size, args.seed)
+    npz_path = save_model(model, args.model_path)
+    print(f"✅ Trained in {time.perf_counter() - started:.1f}s: best move on {share:.2%} of boards")
+    print(f"💾 Model saved to: {args.model_path} (NumPy weights: {npz_path})")
+
+
+if __name__ == "__main__":
+    main()